@@ -1,10 +1,6 @@
 # -*- coding: utf-8 -*-
+# geopandas / shapely / scipy / matplotlib 导入耗时远超计算本身，只在用到的函数内部导入
 import numpy as np
-from shapely.geometry import Point, Polygon
-import geopandas as gpd
-from shapely.ops import unary_union
-import matplotlib.pyplot as plt
-from scipy.spatial import Voronoi
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -39,6 +35,8 @@ def fix_geometry(geom):
     """
     修复几何图形，确保多边形闭合
     """
+    from shapely.geometry import Polygon
+
     if geom.is_empty:
         return geom
 
@@ -63,6 +61,10 @@ def create_voronoi_polygons(points_gdf, boundary):
     """
     创建泰森多边形 - 改进版本
     """
+    import geopandas as gpd
+    from shapely.geometry import Polygon
+    from scipy.spatial import Voronoi
+
     # 获取点坐标
     points = [point for point in points_gdf.geometry]
     coords = [(point.x, point.y) for point in points]
@@ -112,6 +114,9 @@ def main():
     """
     主函数
     """
+    import geopandas as gpd
+    from shapely.ops import unary_union
+
     print("=" * 60)
     print("泰森多边形权重计算与可视化")
     print("=" * 60)
@@ -272,6 +277,8 @@ def main():
 
     # 8. 可视化
     print("\n正在生成可视化图形...")
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.sans-serif'] = ['Arial Unicode MS']  # 设置中文字体
     fig, ax = plt.subplots(1, 1, figsize=PLOT_SIZE)
 
     # 绘制泰森多边形
@@ -329,8 +336,5 @@ def main():
 
 
 if __name__ == "__main__":
-    # 设置中文字体
-    plt.rcParams['font.sans-serif'] = ['Arial Unicode MS']
-
     # 执行主程序
     main()
\ No newline at end of file
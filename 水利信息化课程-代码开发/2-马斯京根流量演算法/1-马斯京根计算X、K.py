@@ -8,6 +8,11 @@ warnings.filterwarnings('ignore')
 # 设置中文字体，使用绝对路径
 font_path = r'D:\Python pro\水文计算\水利信息化课程-代码开发\2-马斯京根流量演算法\FZYTK.TTF'
 font = FontProperties(fname=font_path, size=14)
+
+# 是否弹出图形窗口；False=切换到非交互后端，只保存图片（服务器、批量运行时不阻塞）
+SHOW_FIGURE = True
+if not SHOW_FIGURE:
+    plt.switch_backend('Agg')
 # 数据准备
 delta_T = 1  # 时间间隔deltaT
 '''时段,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18
@@ -72,6 +77,8 @@ plt.ylabel('流量 Q (m³/s)', fontproperties=font)
 plt.legend()
 plt.grid(True)
 plt.savefig('计算X、K.png', bbox_inches='tight', dpi=300)
-plt.show()
+if SHOW_FIGURE:
+    plt.show()
+plt.close()
 
 print(f"计算结果 - K值: {K:.4f}, 最佳x值: {best_x:.2f}")
\ No newline at end of file
@@ -9,6 +9,11 @@ warnings.filterwarnings('ignore')
 # 设置中文字体，使用绝对路径
 font_path = r'D:\Python pro\水文计算\水利信息化课程-代码开发\2-马斯京根流量演算法\FZYTK.TTF'
 font = FontProperties(fname=font_path, size=14)
+
+# 是否弹出图形窗口；False=切换到非交互后端，只保存图片（服务器、批量运行时不阻塞）
+SHOW_FIGURE = True
+if not SHOW_FIGURE:
+    plt.switch_backend('Agg')
 # ==============================
 # 马斯京根流量演算法参数设置
 # ==============================
@@ -96,6 +101,8 @@ plt.tight_layout()
 plt.savefig(r'D:\Python pro\水文计算\水利信息化课程-代码开发\2-马斯京根流量演算法/下游流量计算.png', dpi=300, bbox_inches='tight')
 
 # 显示图形
-plt.show()
+if SHOW_FIGURE:
+    plt.show()
+plt.close()
 
 print(fr"\n图形已保存至: D:\\Python pro\\水文计算\\水利信息化课程-代码开发\\2-马斯京根流量演算法/下游流量计算.png")
\ No newline at end of file
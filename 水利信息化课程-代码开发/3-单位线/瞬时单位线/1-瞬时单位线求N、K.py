@@ -31,6 +31,7 @@ TIME_STEP = 3  # 时间步长 (小时) - 根据您的数据，这是3小时
 # 4. 可视化设置
 PLOT_SIZE = (14, 8)  # 图形尺寸 (宽, 高)
 IMAGE_DPI = 300  # 输出图片分辨率
+SHOW_FIGURE = True  # False=非交互后端只保存图片（服务器、批量运行时不阻塞）
 
 # 5. 坐标轴设置
 R_AXIS_LABEL = '净雨量 (mm)'  # 左侧Y轴标签 (输入序列)
@@ -262,12 +263,16 @@ def plot_hydrographs(R, Q, dt, N, K):
 
     fig.tight_layout()
     plt.savefig(OUTPUT_IMAGE_PATH, dpi=IMAGE_DPI, bbox_inches='tight')
-    plt.show()
+    if SHOW_FIGURE:
+        plt.show()
+    plt.close()
 
     print(f"图形已保存至: {OUTPUT_IMAGE_PATH}")
 
 
 if __name__ == "__main__":
+    if not SHOW_FIGURE:
+        plt.switch_backend('Agg')
     # 全局设置字体
     plt.rcParams['font.family'] = font.get_name()
     plt.rcParams['font.size'] = font.get_size()
@@ -38,6 +38,7 @@ FLOW_COLUMN = '流量(m³/s)'  # 流量列名
 PLOT_SIZE = (12, 8)  # 图形尺寸 (宽, 高)
 IMAGE_DPI = 300  # 输出图片分辨率
 OUTPUT_IMAGE_NAME = '瞬时参数验证时段流量过程.png'  # 输出图片名称
+SHOW_FIGURE = True  # False=非交互后端只保存图片（服务器、批量运行时不阻塞）
 
 
 # ==============================
@@ -279,7 +280,9 @@ def plot_unit_hydrograph(time_points, duh_values, peak_flow, peak_time, std_time
 
     plt.tight_layout()
     plt.savefig(OUTPUT_IMAGE_NAME, dpi=IMAGE_DPI, bbox_inches='tight')
-    plt.show()
+    if SHOW_FIGURE:
+        plt.show()
+    plt.close()
 
     print(f"\n图形已保存至: {OUTPUT_IMAGE_NAME}")
 
@@ -355,10 +358,14 @@ def example_calculation():
     plt.xticks(np.arange(0, t_max + 1, 6))
     plt.tight_layout()
     plt.savefig('comparison_unit_hydrograph.png', dpi=300)
-    plt.show()
+    if SHOW_FIGURE:
+        plt.show()
+    plt.close()
 
 
 if __name__ == "__main__":
+    if not SHOW_FIGURE:
+        plt.switch_backend('Agg')
     # 全局设置字体
     plt.rcParams['font.family'] = font.get_name()
     plt.rcParams['font.size'] = font.get_size()
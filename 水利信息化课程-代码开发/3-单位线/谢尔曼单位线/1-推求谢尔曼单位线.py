@@ -7,6 +7,11 @@ warnings.filterwarnings('ignore')
 font_path = r'D:\Python pro\水文计算\水利信息化课程-代码开发\2-马斯京根流量演算法\FZYTK.TTF'
 font = FontProperties(fname=font_path, size=14)
 
+# 是否弹出图形窗口；False=切换到非交互后端，只保存图片（服务器、批量运行时不阻塞）
+SHOW_FIGURE = True
+if not SHOW_FIGURE:
+    plt.switch_backend('Agg')
+
 # ==============================
 # 输入数据
 # ==============================
@@ -143,7 +148,9 @@ plt.tight_layout()
 plt.savefig('推求谢尔曼单位线.png', dpi=300, bbox_inches='tight')
 
 # 显示图形
-plt.show()
+if SHOW_FIGURE:
+    plt.show()
+plt.close()
 
 # ==============================
 # 最终结果输出
@@ -33,6 +33,7 @@ TIME_INTERVAL = 6  # 时间间隔 (小时)
 PLOT_SIZE = (14, 10)
 IMAGE_DPI = 300
 ENABLE_COMPARISON = True  # 设为False可禁用对比数据显示
+SHOW_FIGURE = True  # False=非交互后端只保存图片（服务器、批量运行时不阻塞）
 
 # 5. 字体设置
 FONT_PATH = r'D:\Python pro\水文计算\水利信息化课程-代码开发\2-马斯京根流量演算法\FZYTK.TTF'
@@ -190,6 +191,8 @@ def main():
     print(f"计算洪峰出现时间: {time_dr[Q.argmax()]} 时段")
 
     # 设置中文字体
+    if not SHOW_FIGURE:
+        plt.switch_backend('Agg')
     try:
         font = FontProperties(fname=FONT_PATH, size=14)
         plt.rcParams['font.family'] = font.get_name()
@@ -294,7 +297,9 @@ def plot_results(time_rain, excess_rain, time_dr, Q, unit_direct_runoff, compari
 
     plt.tight_layout()
     plt.savefig(OUTPUT_IMAGE_PATH, dpi=IMAGE_DPI, bbox_inches='tight')
-    plt.show()
+    if SHOW_FIGURE:
+        plt.show()
+    plt.close()
 
     print(f"\n图形已保存至: {OUTPUT_IMAGE_PATH}")
 
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+调洪演算核心包 —— 演算函数只依赖 NumPy，供调度程序、批量任务反复调用
+--------------------------------------------------
+    curves      读取 CSV 曲线与过程线、分段线性查表、V→z / V→q 组合表、蓄量指示法节点表
+    routing     时段整理、RK4 / 隐式法单步、逐时段演算、蓄量指示法（含集合、只取峰值）、马斯京根河段演算
+    downsample  长序列 LTTB 抽稀
+    cache       演算结果缓存（输入文件与参数的哈希作键，计算脚本与可视化脚本共用）
+    plotting    过程线绘图（不随本包导入；matplotlib 在首次绘图时才加载）
+    startup     启动耗时预算检查：python -m floodroute.startup
+--------------------------------------------------
+import floodroute 只加载 NumPy；scipy 只在入库流量取 'pchip' 插值时加载，
+matplotlib、字体设置只在调用 floodroute.plotting 的绘图函数时加载
+单位约定：水位 m，库容 m³（读取时“万m³”→m³），流量 m³/s，时间 h（演算内部 s）
+"""
+from .curves import (read_table, write_table, read_curves, make_lookup, interp_extrap, build_V_lookups,
+                     indication_nodes)
+from .routing import (regularize_time_steps, inflow_function, inflow_stages, rk4_step, implicit_step, STEP_FUNCTIONS,
+                      route_fixed_step, build_storage_indication, route_storage_indication,
+                      route_storage_indication_peaks, route_muskingum)
+from .downsample import lttb_indices, downsample
+from .cache import run_hash, cache_path, load_cache, save_cache
+
+__all__ = [
+    'read_table', 'write_table', 'read_curves', 'make_lookup', 'interp_extrap', 'build_V_lookups', 'indication_nodes',
+    'regularize_time_steps', 'inflow_function', 'inflow_stages', 'rk4_step', 'implicit_step', 'STEP_FUNCTIONS',
+    'route_fixed_step', 'build_storage_indication', 'route_storage_indication', 'route_storage_indication_peaks',
+    'route_muskingum',
+    'lttb_indices', 'downsample',
+    'run_hash', 'cache_path', 'load_cache', 'save_cache',
+]
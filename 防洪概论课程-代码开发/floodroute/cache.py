@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+演算结果缓存：输入文件内容与演算参数的哈希作键，结果数组存为 .npz
+计算脚本与对应的可视化脚本用同一个键，输入与参数不变时可视化直接读取计算脚本的结果
+"""
+import os
+import json
+import hashlib
+import numpy as np
+
+
+def run_hash(paths, params):
+    """输入文件内容与演算参数（可 JSON 序列化的列表）的 SHA-1；任一变化时键随之改变"""
+    h = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    h.update(json.dumps(params).encode('utf-8'))
+    return h.hexdigest()
+
+
+def cache_path(cache_dir, prefix, key):
+    return os.path.join(cache_dir, f'{prefix}_{key}.npz')
+
+
+def load_cache(cache_dir, prefix, key):
+    """读取缓存的 {名称: 数组}；cache_dir 为空或没有缓存时返回 None"""
+    if not cache_dir or not os.path.exists(cache_path(cache_dir, prefix, key)):
+        return None
+    with np.load(cache_path(cache_dir, prefix, key)) as data:
+        return {name: data[name] for name in data.files}
+
+
+def save_cache(cache_dir, prefix, key, **arrays):
+    """先写临时文件再替换，中断时不留下不完整的缓存；cache_dir 为空时不缓存"""
+    if not cache_dir:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(cache_dir, prefix, key)
+    with open(path + '.tmp', 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(path + '.tmp', path)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+曲线与过程线读写、分段线性查表
+CSV 用标准库 csv 模块读写，不加载 pandas；查表两端按端段线性外延，
+结果与 interp1d(..., fill_value='extrapolate') 相同，不加载 scipy
+"""
+import os
+import csv
+from bisect import bisect_right
+import numpy as np
+
+# 曲线文件列名（曲线插值脚本输出的列名）
+Z_COL = '水位Z/m'
+V_COL = '库容V/万m3'
+Q_COL = '下泄流量q/(m3·s)'
+
+
+def read_table(path, columns, encoding='utf-8'):
+    """读取 CSV 中指定的若干列，按 columns 顺序返回 float 数组；空值记为 NaN"""
+    with open(path, encoding=encoding, newline='') as f:
+        rows = csv.reader(f)
+        header = [name.lstrip('\ufeff').strip() for name in next(rows)]
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise KeyError(f'{path} 缺少列：{missing}')
+        index = [header.index(name) for name in columns]
+        data = [[float(row[k]) if row[k].strip() else np.nan for k in index]
+                for row in rows if row]
+    values = np.array(data, dtype=float).reshape(-1, len(columns))
+    return tuple(values[:, k] for k in range(len(columns)))
+
+
+def write_table(path, columns, encoding='utf-8-sig'):
+    """把 {列名: 数组} 写为 CSV；先写临时文件再替换，中途出错不会留下半个文件"""
+    names = list(columns)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding=encoding, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*(np.asarray(columns[name]).tolist() for name in names)))
+    os.replace(tmp, path)
+
+
+def read_curves(storage_file, discharge_file, encoding='utf-8', discharge_encoding=None):
+    """读取水位-库容、水位-下泄流量曲线，返回 Z_sto, V_sto(m³), Z_dis, q_dis；discharge_encoding=None 时与 encoding 相同"""
+    Z_sto, V_sto = read_table(storage_file, [Z_COL, V_COL], encoding)
+    Z_dis, q_dis = read_table(discharge_file, [Z_COL, Q_COL], discharge_encoding or encoding)
+    return Z_sto, V_sto * 1e4, Z_dis, q_dis     # 库容：万m³ → m³
+
+
+def make_lookup(x_nodes, y_nodes):
+    """
+    分段线性表的标量查表函数：bisect 定位区间 + 线性插值，两端按端段线性外延
+    lookup.slope(x) 为所在区间斜率（隐式法牛顿迭代用），lookup.max_slope 为全表最大斜率（刚性判断用）
+    """
+    xs = [float(x) for x in x_nodes]
+    ys = [float(y) for y in y_nodes]
+    slopes = [(ys[k + 1] - ys[k]) / (xs[k + 1] - xs[k]) for k in range(len(xs) - 1)]
+    last = len(xs) - 2
+
+    def segment(x):
+        k = bisect_right(xs, x) - 1
+        return 0 if k < 0 else (last if k > last else k)
+
+    def lookup(x):
+        k = segment(x)
+        return ys[k] + slopes[k] * (x - xs[k])
+
+    lookup.slope = lambda x: slopes[segment(x)]
+    lookup.max_slope = max(slopes)
+    return lookup
+
+
+def interp_extrap(x, xp, fp):
+    """分段线性插值（数组版），两端按端段线性外延，与 interp1d(..., fill_value='extrapolate') 相同"""
+    xp, fp = np.asarray(xp, dtype=float), np.asarray(fp, dtype=float)
+    k = np.clip(np.searchsorted(xp, x, side='right') - 1, 0, len(xp) - 2)
+    return fp[k] + (fp[k + 1] - fp[k]) / (xp[k + 1] - xp[k]) * (x - xp[k])
+
+
+def build_V_lookups(Z_sto, V_sto, Z_dis, q_dis):
+    """
+    把 V→z、z→q 两条分段线性曲线组合为 V→q 表，返回 V→z、V→q 查表函数
+    表节点取库容曲线节点与泄流曲线节点（换算为库容）的并集，组合结果与逐次插值一致
+    """
+    storage, level, discharge = make_lookup(Z_sto, V_sto), make_lookup(V_sto, Z_sto), make_lookup(Z_dis, q_dis)
+    V_nodes = np.union1d(V_sto, [storage(z) for z in Z_dis])
+    z_nodes = np.array([level(v) for v in V_nodes])
+    q_nodes = np.array([discharge(z) for z in z_nodes])
+    if np.any(np.diff(q_nodes) < 0):
+        raise ValueError('组合得到的 V→q 关系不单调，请检查库容曲线与下泄流量曲线')
+    return make_lookup(V_nodes, z_nodes), make_lookup(V_nodes, q_nodes)
+
+
+def indication_nodes(Z_sto, V_sto, Z_dis, q_dis, z_min=None, z_max=None):
+    """
+    蓄量指示法水位节点表：节点取两曲线水位并集，节点间两曲线均为线性，返回 Z_nodes, V_nodes, q_nodes
+    给出 z_min、z_max 时节点限制在该范围内（上下限本身为节点，超出曲线范围部分按曲线线性外延）
+    """
+    Z_nodes = np.union1d(Z_sto, Z_dis)
+    if z_min is not None or z_max is not None:
+        z_min = Z_nodes[0] if z_min is None else z_min
+        z_max = Z_nodes[-1] if z_max is None else z_max
+        Z_nodes = np.union1d(Z_nodes, [z_min, z_max])
+        Z_nodes = Z_nodes[(Z_nodes >= z_min) & (Z_nodes <= z_max)]
+    return Z_nodes, interp_extrap(Z_nodes, Z_sto, V_sto), interp_extrap(Z_nodes, Z_dis, q_dis)
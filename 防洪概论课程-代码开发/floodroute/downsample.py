@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""长序列抽稀：绘图前把几十万点的过程线压到图宽像素量级，峰值点总保留"""
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 抽稀：把中间点等分为 n_out-2 个桶，每桶取与前一选中点、
+    下一桶平均点构成三角形面积最大的点，首末点必选；返回选中点下标
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    idx = np.empty(n_out, dtype=int)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < n_out - 1:
+            cx, cy = x[hi:edges[b + 2]].mean(), y[hi:edges[b + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[b + 1] = a
+    return idx
+
+
+def downsample(x, y, n_out):
+    """按 LTTB 抽稀一条曲线，最大值点（图上标注的峰值）总保留；n_out 为 0 时不抽稀"""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if not n_out or len(x) <= n_out:
+        return x, y
+    idx = np.union1d(lttb_indices(x, y, n_out), [np.argmax(y)])
+    return x[idx], y[idx]
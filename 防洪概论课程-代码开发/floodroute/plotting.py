@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+过程线绘图（上下布局的流量 / 水位过程线，最大值写入图例并标注），RK4、试算法可视化脚本与批量绘图脚本共用；
+各绘图脚本（含方法对比图）都经 pyplot() 取得 pyplot，非交互后端切换与中文字体设置只在这里做
+本模块不随 import floodroute 加载；matplotlib 与中文字体在首次调用绘图函数时才加载、设置，
+只演算不绘图的调度任务不付出这部分启动开销
+"""
+import os
+import numpy as np
+from .downsample import downsample
+
+_plt = None
+
+
+def pyplot(show=False, font_path=None):
+    """
+    首次调用时加载 matplotlib，设置中文字体后返回 pyplot
+    show=False 时使用 Agg 非交互后端，可在无显示器的服务器上运行
+    """
+    global _plt
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    if _plt is None:
+        import matplotlib.pyplot as plt
+        _plt = plt
+    if font_path and os.path.isfile(font_path):
+        from matplotlib.font_manager import FontProperties
+        _plt.rcParams['font.family'] = FontProperties(fname=font_path).get_name()
+    else:
+        _plt.rcParams['font.sans-serif'] = ['Microsoft YaHei']
+    _plt.rcParams['axes.unicode_minus'] = False
+    return _plt
+
+
+class HydrographTemplate:
+    """
+    过程线图模板：画布、线条、网格与坐标轴标签只创建一次，render 只替换数据、图例与标题，
+    批量绘图时各情景复用同一张图
+    """
+
+    def __init__(self, fig_size=(10, 12), show=False, font_path=None):
+        self.plt = pyplot(show, font_path)
+        self.fig_size = fig_size
+        # constrained_layout 在每次保存时按当前标题、图例与刻度重新排版，数据与标题逐文件变化也不会重叠
+        self.fig, (self.ax_q, self.ax_z) = self.plt.subplots(2, 1, figsize=fig_size, constrained_layout=True)
+
+        # 上子图：时间-流量过程线
+        self.line_Q, = self.ax_q.plot([], [], color='dodgerblue', lw=1.8)
+        self.line_q, = self.ax_q.plot([], [], color='orangered', lw=1.8)
+        self.peak_Q, = self.ax_q.plot([], [], 'o', color='dodgerblue', zorder=5)
+        self.peak_q, = self.ax_q.plot([], [], 'o', color='orangered', zorder=5)
+        self.ax_q.set_ylabel('流量 / m³·s⁻¹')
+        self.ax_q.grid(True, alpha=0.3)
+
+        # 下子图：时间-水位过程线
+        self.line_z, = self.ax_z.plot([], [], color='forestgreen', lw=1.8)
+        self.peak_z, = self.ax_z.plot([], [], 'o', color='forestgreen', zorder=5)
+        self.ax_z.set_xlabel('时间 t/h')
+        self.ax_z.set_ylabel('水位 Z / m')
+        self.ax_z.grid(True, alpha=0.3)
+
+    def render(self, t, Q_in, q_out, z_out, title='', save_path=None, dpi=150, max_points=None):
+        """
+        替换为一组过程线并保存（save_path 为空时不保存）；
+        max_points 为每条曲线最多绘制点数（LTTB 抽稀），None=图宽像素数，0=不抽稀
+        """
+        t, Q_in, q_out, z_out = (np.asarray(a, dtype=float) for a in (t, Q_in, q_out, z_out))
+        iQ, iq, iz = Q_in.argmax(), q_out.argmax(), z_out.argmax()
+        n_points = int(self.fig_size[0] * dpi) if max_points is None else max_points
+        self.line_Q.set_data(*downsample(t, Q_in, n_points))
+        self.line_q.set_data(*downsample(t, q_out, n_points))
+        self.line_z.set_data(*downsample(t, z_out, n_points))
+        self.peak_Q.set_data([t[iQ]], [Q_in[iQ]])
+        self.peak_q.set_data([t[iq]], [q_out[iq]])
+        self.peak_z.set_data([t[iz]], [z_out[iz]])
+
+        # 最大值写入图例
+        self.line_Q.set_label(f'入库流量 Q (max={Q_in[iQ]:.1f})')
+        self.line_q.set_label(f'下泄流量 q (max={q_out[iq]:.1f})')
+        self.line_z.set_label(f'水位 Z (max={z_out[iz]:.2f} m)')
+        self.ax_q.legend(handles=[self.line_Q, self.line_q])
+        self.ax_z.legend(handles=[self.line_z])
+        self.ax_q.set_title(f'时间-流量过程线（{title}）')
+        self.ax_z.set_title(f'时间-水位过程线（{title}）')
+
+        for ax in (self.ax_q, self.ax_z):
+            ax.relim()
+            ax.autoscale_view()
+        if save_path:
+            self.fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+
+    def close(self):
+        self.plt.close(self.fig)
+
+
+def plot_hydrograph(t, Q_in, q_out, z_out, title='', save_path=None, show=False,
+                    fig_size=(10, 12), dpi=150, max_points=None, font_path=None):
+    """绘制一张流量 / 水位过程线；show=True 时弹出图形窗口，关闭后返回"""
+    template = HydrographTemplate(fig_size, show, font_path)
+    template.render(t, Q_in, q_out, z_out, title, save_path, dpi, max_points)
+    if show:
+        template.plt.show()
+    template.close()
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+演算核心：微分方程 dV/dt = Q(t) - q(z)
+    rk4_step       定步长四阶龙格-库塔单步
+    implicit_step  θ 格式隐式单步（θ=1 向后欧拉，θ=0.5 梯形公式），牛顿迭代 + 二分保护
+    route_storage_indication  蓄量指示法（水量平衡 + 2V/Δt+q 指示表），单过程或集合成员同时推进
+    route_muskingum           马斯京根河段演算
+时段可不等长；V_z、V_q 为 curves.build_V_lookups 生成的查表函数
+"""
+import numpy as np
+
+
+def cumulative_volume(t_nodes, Q_nodes, x):
+    """分段线性流量过程自 t_nodes[0] 至 x 的累积水量（流量×时间，与 t 同单位），x 可为数组"""
+    C = np.concatenate(([0.0], np.cumsum(0.5 * (Q_nodes[:-1] + Q_nodes[1:]) * np.diff(t_nodes))))
+    k = np.clip(np.searchsorted(t_nodes, x, side='right') - 1, 0, len(t_nodes) - 2)
+    h = x - t_nodes[k]
+    slope = (Q_nodes[k + 1] - Q_nodes[k]) / (t_nodes[k + 1] - t_nodes[k])
+    return C[k] + Q_nodes[k] * h + 0.5 * slope * h * h
+
+
+def regularize_time_steps(t_h, Q_in, merge_dt_h=0, split_dt_h=0):
+    """
+    整理不等间隔入库过程：剔除缺测（空值）行，检查时间严格递增，
+    按需合并过短时段（洪峰时刻保留）、等分过长时段（线性插值），返回新的 t_h、Q_in
+    合并时各保留时刻的流量加上其代表时段（相邻保留时刻的中点之间）内原过程与合并后折线之差的平均值，
+    被合并时刻的水量计入相邻保留时刻，合并前后梯形法总水量相同；未受合并影响的时刻流量不变
+    """
+    t_h = np.asarray(t_h, dtype=float)
+    Q_in = np.asarray(Q_in, dtype=float)
+    valid = ~(np.isnan(t_h) | np.isnan(Q_in))
+    if not valid.all():
+        print(f"剔除缺测行 {np.count_nonzero(~valid)} 行")
+        t_h, Q_in = t_h[valid], Q_in[valid]
+    if np.any(np.diff(t_h) <= 0):
+        raise ValueError('入库流量过程线的时间必须严格递增')
+
+    if merge_dt_h > 0:
+        peak = int(np.argmax(Q_in))
+        keep = [0]
+        for i in range(1, len(t_h) - 1):
+            if t_h[i] - t_h[keep[-1]] >= merge_dt_h or i == peak:
+                keep.append(i)
+        # 末时刻总保留；与前一保留时刻过近时去掉前一个（起点与洪峰除外）
+        if len(keep) > 1 and t_h[-1] - t_h[keep[-1]] < merge_dt_h and keep[-1] != peak:
+            keep.pop()
+        keep.append(len(t_h) - 1)
+        if len(keep) < len(t_h):
+            t_new, Q_new = t_h[keep], Q_in[keep]
+            # 各保留时刻的代表时段：相邻保留时刻的中点之间（首末时刻取到过程线端点）
+            mids = 0.5 * (t_new[:-1] + t_new[1:])
+            lo, hi = np.append(t_new[0], mids), np.append(mids, t_new[-1])
+            lost = (cumulative_volume(t_h, Q_in, hi) - cumulative_volume(t_h, Q_in, lo)
+                    - cumulative_volume(t_new, Q_new, hi) + cumulative_volume(t_new, Q_new, lo))
+            t_h, Q_in = t_new, Q_new + lost / (hi - lo)
+
+    if split_dt_h > 0:
+        d = np.diff(t_h)
+        k = np.maximum(np.ceil(d / split_dt_h - 1e-9).astype(int), 1)   # 各时段等分份数
+        idx = np.repeat(np.arange(len(d)), k)
+        frac = (np.arange(k.sum()) - np.repeat(np.cumsum(k) - k, k)) / np.repeat(k, k)
+        t_new = np.append(t_h[idx] + frac * d[idx], t_h[-1])
+        Q_in = np.interp(t_new, t_h, Q_in)
+        t_h = t_new
+    return t_h, Q_in
+
+
+def inflow_function(t_s, Q_in, kind='linear'):
+    """
+    入库流量随时间（s）的连续插值函数（接受数组）：
+    'linear' 分段线性；'pchip' 保单调三次，不产生超出相邻实测值的虚假峰谷（此时才加载 scipy）
+    """
+    if kind == 'pchip':
+        from scipy.interpolate import PchipInterpolator
+        return PchipInterpolator(t_s, Q_in, extrapolate=True)
+    if kind == 'linear':
+        return lambda t: np.interp(t, t_s, Q_in)
+    raise ValueError(f'Unsupported inflow interpolation: {kind}')
+
+
+def inflow_stages(t_h, Q_in, kind='average'):
+    """
+    各时段 RK4 阶段时刻（时段初、时段中、时段末）的入库流量，一次算出；时段可不等长
+    'average' 三者均为时段平均入库流量（梯形假设）；'linear'、'pchip' 按 inflow_function 插值
+    """
+    Q_in = np.asarray(Q_in, dtype=float)
+    if kind == 'average':
+        Q_avg = 0.5 * (Q_in[:-1] + Q_in[1:])
+        return Q_avg, Q_avg, Q_avg
+    t_s = np.asarray(t_h, dtype=float) * 3600
+    t_mid = 0.5 * (t_s[:-1] + t_s[1:])
+    Q_t = inflow_function(t_s, Q_in, kind)
+    return Q_t(t_s[:-1]), Q_t(t_mid), Q_t(t_s[1:])
+
+
+def rk4_step(V_prev, Q_stages, V_z, V_q, dt, stats=None):
+    """
+    单步 RK4 积分；Q_stages 为时段初、时段中、时段末的入库流量
+    返回下一时刻 V 及对应 z、q；stats 不为 None 时记录 dV/dt 求值次数
+    """
+    Q_start, Q_mid, Q_end = Q_stages
+
+    def dVdt(Q, V):
+        return Q - V_q(V)   # m³/s
+
+    k1 = dVdt(Q_start, V_prev)
+    k2 = dVdt(Q_mid,   V_prev + 0.5*dt*k1)
+    k3 = dVdt(Q_mid,   V_prev + 0.5*dt*k2)
+    k4 = dVdt(Q_end,   V_prev +       dt*k3)
+
+    V_new = V_prev + (dt/6.0)*(k1 + 2*k2 + 2*k3 + k4)
+    if stats is not None:
+        stats.update(evaluations=4, iterations=1, residual=None, fallback=False)
+    return V_new, V_z(V_new), V_q(V_new)
+
+
+def implicit_step(V_prev, Q_stages, V_z, V_q, dt, stats=None, theta=1.0, tol=1e-3, max_iter=50):
+    """
+    单步 θ 格式隐式积分，接口与 rk4_step 相同
+    求解 F(V) = V + θ·Δt·q(V) - b = 0；q(V) 单调不减，根唯一，
+    牛顿迭代点越出已知的根所在区间时改用二分；tol 为库容容差（m³）
+    """
+    Q_start, _, Q_end = Q_stages
+    q_prev = V_q(V_prev)
+    b = V_prev + dt * ((1 - theta) * (Q_start - q_prev) + theta * Q_end)
+
+    V, q, lo, hi = V_prev, q_prev, -np.inf, np.inf
+    evaluations, iterations = 1, 0
+    F = V + theta * dt * q - b
+    while abs(F) > tol and iterations < max_iter:
+        if F > 0:
+            hi = V
+        else:
+            lo = V
+        V_next = V - F / (1 + theta * dt * V_q.slope(V))
+        if not lo < V_next < hi:
+            V_next = 0.5 * (lo + hi)
+        V = V_next
+        q = V_q(V)
+        F = V + theta * dt * q - b
+        evaluations += 1
+        iterations += 1
+
+    if stats is not None:
+        stats.update(evaluations=evaluations, iterations=iterations, residual=abs(F),
+                     fallback=abs(F) > tol)
+    return V, V_z(V), q
+
+
+STEP_FUNCTIONS = {
+    'rk4':            rk4_step,
+    'implicit_euler': lambda *args, **kw: implicit_step(*args, **kw, theta=1.0),
+    'trapezoidal':    lambda *args, **kw: implicit_step(*args, **kw, theta=0.5),
+}
+
+
+def route_fixed_step(t_h, Q_in, V0, V_z, V_q, solver='rk4', inflow_interp='average'):
+    """逐时段演算整个过程（时段即入库流量相邻时刻），返回各时刻 V(m³)、z、q 数组"""
+    if solver not in STEP_FUNCTIONS:
+        raise ValueError(f'Unsupported solver: {solver}')
+    step = STEP_FUNCTIONS[solver]
+    dt = np.diff(np.asarray(t_h, dtype=float)) * 3600
+    Q_start, Q_mid, Q_end = inflow_stages(t_h, Q_in, inflow_interp)
+
+    n = len(dt) + 1
+    V = np.empty(n); z = np.empty(n); q = np.empty(n)
+    V[0], z[0], q[0] = V0, V_z(V0), V_q(V0)
+    for i in range(1, n):
+        V[i], z[i], q[i] = step(V[i-1], (Q_start[i-1], Q_mid[i-1], Q_end[i-1]), V_z, V_q, dt[i-1])
+    return V, z, q
+
+
+def build_storage_indication(V_nodes, q_nodes, dt):
+    """时段长 dt（s）对应的蓄量指示关系 2V/Δt+q（m³/s），要求严格单调递增"""
+    indication = 2 * V_nodes / dt + q_nodes
+    if not np.all(np.diff(indication) > 0):
+        raise ValueError(f'时段长 {dt} s 下 2V/Δt+q 关系不单调，请检查库容曲线与下泄流量曲线')
+    return indication
+
+
+def _lookup(x, xp, *fps):
+    """单调表批量查表：对 x 中全部元素只做一次 searchsorted，返回各 fp 的线性插值结果（超出表范围按端点取值）"""
+    idx = np.clip(np.searchsorted(xp, x) - 1, 0, len(xp) - 2)
+    w = np.clip((x - xp[idx]) / (xp[idx + 1] - xp[idx]), 0.0, 1.0)
+    return [fp[idx] + w * (fp[idx + 1] - fp[idx]) for fp in fps]
+
+
+def _indication_steps(t_h, Q, Z0, Z_nodes, V_nodes, q_nodes, V0, q0, tables):
+    """
+    蓄量指示法逐时段推进，依次产出 (i, z, q, V, 本时段是否超出指示表范围)；i=0 为初始状态
+    Q 的最后一维为时间，其余维为成员
+    """
+    shape = Q.shape[:-1]
+    z = np.broadcast_to(np.asarray(Z0, dtype=float), shape).copy()
+    V = np.interp(z, Z_nodes, V_nodes) if V0 is None else np.broadcast_to(np.asarray(V0, dtype=float), shape).copy()
+    q = np.interp(z, Z_nodes, q_nodes) if q0 is None else np.broadcast_to(np.asarray(q0, dtype=float), shape).copy()
+    # 各时段 Q₁+Q₂（时段为第 0 维）与时段长（s）一次算出
+    Q_sum = np.moveaxis(Q[..., :-1] + Q[..., 1:], -1, 0)
+    dts = (np.diff(np.asarray(t_h, dtype=float)) * 3600).tolist()
+    lookup = _lookup
+    if not shape:
+        # 单过程：Python 标量运算与 np.interp 比 0 维数组快得多
+        z, q, V = float(z), float(q), float(V)
+        Q_sum = Q_sum.tolist()
+        lookup = lambda x, xp, *fps: [np.interp(x, xp, fp) for fp in fps]
+    yield 0, z, q, V, False
+    for i, dt in enumerate(dts, start=1):
+        if dt not in tables:
+            tables[dt] = build_storage_indication(V_nodes, q_nodes, dt)
+        si = tables[dt]
+        value = Q_sum[i-1] + 2 * V / dt - q
+        outside = (value < si[0]) | (value > si[-1])
+        z, q_new = lookup(value, si, Z_nodes, q_nodes)
+        V = V + (0.5 * Q_sum[i-1] - 0.5 * (q + q_new)) * dt
+        q = q_new
+        yield i, z, q, V, outside
+
+
+def _warn_out_of_range(out, Z_nodes):
+    where = f"共{int(out)}个时段" if np.ndim(out) == 0 else f"{np.count_nonzero(out)} 个成员"
+    print(f"警告：{where}超出关系表水位范围[{Z_nodes[0]}, {Z_nodes[-1]}]，已按边界取值，请扩大关系表水位范围")
+
+
+def route_storage_indication(t_h, Q_in, Z0, Z_nodes, V_nodes, q_nodes, V0=None, q0=None, warn=True, tables=None):
+    """
+    蓄量指示法：(Q₁+Q₂) + 2V₁/Δt - q₁ = 2V₂/Δt + q₂，右端由指示表反查水位与下泄流量
+    Q_in 为一维过程，或 (成员数, 时刻数) 的集合，全部成员同时推进、共用指示表；
+    Z0、V0(m³)、q0 为标量或各成员的数组，V0、q0 为 None 时由节点表按 Z0 求得
+    各时段长的指示表只生成一次（tables 可传入跨次调用复用的缓存）；右端超出指示表范围时按表端点取值，
+    warn=True 时汇总提示。返回与 Q_in 同形状的 z、q、V(m³)
+    """
+    Q = np.asarray(Q_in, dtype=float)
+    # 结果按 (时刻, 成员) 存放，逐时刻写入连续内存，返回时转为与 Q_in 同形状
+    shape = (Q.shape[-1],) + Q.shape[:-1]
+    z = np.empty(shape); q = np.empty(shape); V = np.empty(shape)
+    out = np.zeros(Q.shape[:-1], dtype=int) if Q.ndim > 1 else 0    # 各成员超出指示表范围的时段数
+    for i, z[i], q[i], V[i], outside in _indication_steps(t_h, Q, Z0, Z_nodes, V_nodes, q_nodes, V0, q0,
+                                                          {} if tables is None else tables):
+        out += outside
+    if warn and np.any(out):
+        _warn_out_of_range(out, Z_nodes)
+    return np.moveaxis(z, 0, -1), np.moveaxis(q, 0, -1), np.moveaxis(V, 0, -1)
+
+
+def route_storage_indication_peaks(t_h, Q_in, Z0, Z_nodes, V_nodes, q_nodes, V0=None, q0=None, warn=True,
+                                   tables=None):
+    """
+    与 route_storage_indication 相同的演算，不保存过程，只保留当前状态与最高水位、最大下泄流量
+    返回 z_max、q_max 及各成员超出指示表范围的时段数（一维入流时均为标量）
+    """
+    Q = np.asarray(Q_in, dtype=float)
+    out = np.zeros(Q.shape[:-1], dtype=int) if Q.ndim > 1 else 0
+    maximum = np.maximum if Q.ndim > 1 else max
+    z_max = q_max = None
+    for i, z, q, V, outside in _indication_steps(t_h, Q, Z0, Z_nodes, V_nodes, q_nodes, V0, q0,
+                                                 {} if tables is None else tables):
+        z_max = z if i == 0 else maximum(z_max, z)
+        q_max = q if i == 0 else maximum(q_max, q)
+        out += outside
+    if warn and np.any(out):
+        _warn_out_of_range(out, Z_nodes)
+    if Q.ndim == 1:
+        return float(z_max), float(q_max), int(out)
+    return z_max, q_max, out
+
+
+def route_muskingum(t_h, I, K, X, initial_Q=None):
+    """
+    马斯京根法（等时段）：Q[i] = C0·I[i] + C1·I[i-1] + C2·Q[i-1]，K 与 Δt 均为小时
+    initial_Q 为初始出流；None=取初始入流
+    """
+    dt_all = np.diff(t_h)
+    if not np.allclose(dt_all, dt_all[0]):
+        raise ValueError('马斯京根河段要求等时段入流')
+    dt = dt_all[0]
+    denom = K - K * X + 0.5 * dt
+    C0 = (0.5 * dt - K * X) / denom
+    C1 = (0.5 * dt + K * X) / denom
+    C2 = (K - K * X - 0.5 * dt) / denom
+
+    I = np.asarray(I, dtype=float)
+    Q = np.empty(len(I))
+    Q[0] = I[0] if initial_Q is None else initial_Q
+    # 前两项与上一时段出流无关，一次算出；递推只剩一次乘加
+    forced = C0 * I[1:] + C1 * I[:-1]
+    for i in range(1, len(I)):
+        Q[i] = forced[i-1] + C2 * Q[i-1]
+    return Q
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时预算检查：python -m floodroute.startup
+--------------------------------------------------
+调度程序每次调用都是一个新进程，进程启动 + 导入的耗时可能超过一次小规模演算本身。
+本脚本在新进程中分别测量（各取 RUNS 次中位数）：
+    基准    python -c "import numpy"
+    导入    python -c "import floodroute"
+    演算    导入 + 合成曲线上一次 RK4 与蓄量指示法演算（REPEAT_STEPS 个时段）
+以相对基准的增量与预算比较（与机器快慢无关），并检查导入后没有加载绘图、GIS、scipy、pandas 等重依赖；
+超出预算或加载了重依赖时以退出码 1 结束，可直接放进 CI 或部署检查
+"""
+import os
+import sys
+import json
+import subprocess
+import time
+import statistics
+
+# ========== 预算参数 ==========
+RUNS = 7                   # 每项测量的进程数，取中位数
+IMPORT_BUDGET_MS = 50      # import floodroute 相对 import numpy 的增量上限（ms）
+ROUTE_BUDGET_MS = 100      # 导入 + 一次小规模演算相对 import numpy 的增量上限（ms）
+REPEAT_STEPS = 200         # 小规模演算的时段数
+HEAVY_MODULES = ('matplotlib', 'scipy', 'pandas', 'tqdm', 'geopandas', 'shapely')
+
+ROUTE_SNIPPET = f"""
+import numpy as np
+import floodroute as fr
+Z = np.linspace(36.0, 41.0, 51)
+V = 5.0e7 + 2.0e7 * (Z - 36.0)
+q = 150.0 * np.maximum(Z - 37.0, 0.0) ** 1.5
+t = np.arange({REPEAT_STEPS} + 1) * 3.0
+Q = 200.0 + 1800.0 * np.exp(-((t - t[-1] / 3) / 30.0) ** 2)
+V_z, V_q = fr.build_V_lookups(Z, V, Z, q)
+fr.route_fixed_step(t, Q, float(np.interp(38.0, Z, V)), V_z, V_q)
+fr.route_storage_indication(t, Q, 38.0, *fr.indication_nodes(Z, V, Z, q), warn=False)
+"""
+
+REPORT_SNIPPET = f"""
+import sys, json
+print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))
+"""
+
+
+def process_time_ms(code, cwd):
+    """在新进程中执行 code，返回 RUNS 次墙钟耗时的中位数（ms）与最后一次的标准输出"""
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True)
+        times.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f'测量进程失败：\n{result.stderr}')
+    return statistics.median(times), result.stdout
+
+
+def main():
+    # 包所在目录加入子进程的搜索路径（与从脚本目录运行时相同）
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    base_ms, _ = process_time_ms('import numpy', cwd)
+    import_ms, out = process_time_ms('import floodroute' + REPORT_SNIPPET, cwd)
+    route_ms, out_route = process_time_ms(ROUTE_SNIPPET + REPORT_SNIPPET, cwd)
+    # 报告在标准输出的最后一行
+    heavy = sorted(set(json.loads(out.splitlines()[-1])) | set(json.loads(out_route.splitlines()[-1])))
+
+    print(f"基准 import numpy：           {base_ms:7.1f} ms")
+    print(f"import floodroute：           {import_ms:7.1f} ms（增量 {import_ms - base_ms:+.1f} ms，预算 {IMPORT_BUDGET_MS} ms）")
+    print(f"导入 + {REPEAT_STEPS} 时段演算：         {route_ms:7.1f} ms（增量 {route_ms - base_ms:+.1f} ms，预算 {ROUTE_BUDGET_MS} ms）")
+    print(f"已加载的重依赖：{'、'.join(heavy) if heavy else '无'}")
+
+    failures = []
+    if import_ms - base_ms > IMPORT_BUDGET_MS:
+        failures.append('导入耗时超出预算')
+    if route_ms - base_ms > ROUTE_BUDGET_MS:
+        failures.append('演算耗时超出预算')
+    if heavy:
+        failures.append(f"演算路径加载了 {'、'.join(heavy)}")
+    if failures:
+        print('未通过：' + '；'.join(failures))
+        sys.exit(1)
+    print('启动耗时预算检查通过')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多泄水建筑物组合泄流曲线工具  v1.0
+1. 每个泄水建筑物（溢洪道、底孔、发电机组等）各有一条 水位-下泄流量 曲线；
+2. 按“开启方案”（各建筑物开启台数/孔数，0=关闭）叠加为总的 水位-下泄流量 曲线；
+3. 输出格式与 插值水位-下泄流量曲线_*.csv 相同，调洪计算脚本把 discharge_curve_file /
+   DISCHARGE_FILE 指向生成的文件即可，演算过程中不增加任何计算量；
+4. 组合曲线按“曲线内容 + 开启方案 + 水位节点”的哈希缓存，同一方案只生成一次；
+5. 全部可调参数集中放在“用户参数区”。
+"""
+import os
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+
+# ============== 用户参数区（仅需修改这里） ==============
+PARAM = {
+    # ① 各泄水建筑物单台（单孔）泄流曲线
+    'outlets': {
+        '溢洪道':   r'E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\溢洪道水位-下泄流量曲线.csv',
+        '底孔':     r'E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\底孔水位-下泄流量曲线.csv',
+        '发电机组': r'E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\机组水位-过流曲线.csv',
+    },
+    # ② 开启方案：方案名 -> {建筑物: 开启台数/孔数}，未列出的建筑物视为关闭
+    'scenarios': {
+        '全部开启':     {'溢洪道': 1, '底孔': 2, '发电机组': 3},
+        '机组检修':     {'溢洪道': 1, '底孔': 2, '发电机组': 1},
+        '仅溢洪道':     {'溢洪道': 1},
+    },
+    'z_col':      '水位Z/m',              # ③ 曲线文件水位列名
+    'q_col':      '下泄流量q/(m3·s)',     # ④ 曲线文件流量列名
+    'encoding':   'utf-8',                # ⑤ 曲线文件编码 'gbk' 'utf-8' 'latin1'
+    'z_min':      36.0,                   # ⑥ 组合曲线水位范围
+    'z_max':      41.0,
+    'z_step':     0.1,                    # ⑦ 组合曲线水位间隔（与调洪计算所用曲线一致）
+    'sill_eps':   0.001,                  # ⑧ 堰顶/孔口以下零流量节点与其高差（m），使组合曲线在堰顶处突变而非在相邻节点间渐变
+    'cache_dir':  r'E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\组合泄流曲线',  # ⑨ 输出/缓存目录
+}
+# =========================================================
+
+
+def read_outlet_curves(outlets, z_col, q_col, encoding):
+    """读取各建筑物泄流曲线，返回 {名称: (Z, q)}"""
+    curves = {}
+    for name, path in outlets.items():
+        df = pd.read_csv(path, encoding=encoding).sort_values(z_col)
+        curves[name] = (df[z_col].values.astype(float), df[q_col].values.astype(float))
+    return curves
+
+
+def outlet_discharge(Z, Z_curve, q_curve):
+    """
+    单个建筑物泄流量：曲线最低水位以下（堰顶/孔口以下）为 0，
+    曲线范围内线性插值，最高水位以上按最后一段线性外延
+    """
+    q = np.interp(Z, Z_curve, q_curve, left=0.0)
+    above = Z > Z_curve[-1]
+    if above.any() and len(Z_curve) > 1:
+        slope = (q_curve[-1] - q_curve[-2]) / (Z_curve[-1] - Z_curve[-2])
+        q[above] = q_curve[-1] + slope * (Z[above] - Z_curve[-1])
+    return q
+
+
+def combine_curves(curves, counts, z_min, z_max, z_step, sill_eps):
+    """
+    按开启方案叠加组合泄流曲线
+    水位节点 = 固定间隔节点 ∪ 各建筑物曲线节点，保证分段线性叠加没有截断误差；
+    曲线首点流量大于 0 的建筑物再加堰顶/孔口以下 sill_eps 处的节点（该建筑物流量为 0），
+    否则组合曲线按节点线性插值时会从下一个节点起渐变，堰顶以下也有流量
+    """
+    unknown = set(counts) - set(curves)
+    if unknown:
+        raise KeyError(f'开启方案中的建筑物没有泄流曲线：{sorted(unknown)}')
+
+    Z = np.round(np.arange(z_min, z_max + z_step / 2, z_step), 6)
+    for Z_curve, _ in curves.values():
+        Z = np.union1d(Z, Z_curve[(Z_curve > z_min) & (Z_curve < z_max)])
+    for name, n in counts.items():
+        Z_curve, q_curve = curves[name]
+        if n > 0 and q_curve[0] > 0 and z_min < Z_curve[0] - sill_eps:
+            Z = np.union1d(Z, [round(Z_curve[0] - sill_eps, 6)])
+
+    q = np.zeros_like(Z)
+    for name, n in counts.items():
+        if n > 0:
+            q += n * outlet_discharge(Z, *curves[name])
+    return Z, q
+
+
+def config_hash(curves, counts, z_min, z_max, z_step, sill_eps):
+    """曲线内容 + 开启方案 + 水位节点参数的哈希，作为缓存键"""
+    h = hashlib.sha1()
+    for name in sorted(curves):
+        Z_curve, q_curve = curves[name]
+        h.update(name.encode('utf-8'))
+        h.update(Z_curve.tobytes())
+        h.update(q_curve.tobytes())
+    h.update(json.dumps({k: v for k, v in sorted(counts.items()) if v > 0}, ensure_ascii=False).encode('utf-8'))
+    h.update(np.array([z_min, z_max, z_step, sill_eps]).tobytes())
+    return h.hexdigest()[:12]
+
+
+def combined_curve_file(curves, scenario, counts, param):
+    """
+    返回方案对应的组合泄流曲线文件路径；缓存中已有同一配置的文件时直接复用
+    """
+    key = config_hash(curves, counts, param['z_min'], param['z_max'], param['z_step'], param['sill_eps'])
+    out_file = os.path.join(param['cache_dir'], f'组合泄流曲线_{scenario}_{key}.csv')
+    if os.path.isfile(out_file):
+        print(f'=== 缓存命中：{out_file}')
+        return out_file
+
+    Z, q = combine_curves(curves, counts, param['z_min'], param['z_max'], param['z_step'], param['sill_eps'])
+    os.makedirs(param['cache_dir'], exist_ok=True)
+    pd.DataFrame({param['z_col']: Z, param['q_col']: q}).to_csv(out_file, index=False, encoding='utf-8-sig')
+    print(f'<<< 已保存：{out_file}  （行数：{len(Z)}）')
+    return out_file
+
+
+def main():
+    param = PARAM
+    for path in param['outlets'].values():
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+
+    curves = read_outlet_curves(param['outlets'], param['z_col'], param['q_col'], param['encoding'])
+    print(f'>>> 读取泄流曲线：{list(curves)}，方案数：{len(param["scenarios"])}')
+
+    for scenario, counts in param['scenarios'].items():
+        out_file = combined_curve_file(curves, scenario, counts, param)
+        print(f'    方案 {scenario}：{counts} -> {os.path.basename(out_file)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+水库防洪优化调度 —— 动态规划（离散库容状态）
+目标：整场洪水的最大下泄流量最小（极小化最大值）
+约束：水位不超过允许最高水位；时段平均下泄流量不小于最小下泄流量，且不超过闸门全开泄流能力
+--------------------------------------------------
+库容按等间隔 ΔV 离散为约 N 个状态（初始库容恰为其中一个状态），时段 i 由状态 a 转移到状态 b 时：
+    时段平均下泄流量  q = (Q1+Q2)/2 - (V_b - V_a)/Δt = (Q1+Q2)/2 + (a-b)·ΔV/Δt
+    泄流能力          (q_max(V_a) + q_max(V_b))/2
+    递推              F_i(b) = min_a max(F_{i-1}(a), q)
+q 只与状态差 a-b 有关，满足 最小下泄流量 ≤ q ≤ 最大泄流能力 的状态差构成一条带，
+每个时段对全部终止状态 × 带内状态差做一次数组运算；可选按终止状态分块交给进程池并行
+--------------------------------------------------
+单位约定（内部计算）：
+    水位 z：m
+    库容 V：m³（读取时立即把“万m³”→m³）
+    流量 Q/q：m³/s
+"""
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from tqdm import tqdm
+import floodroute as fr
+
+# ========== 用户参数区 ==========
+# 1. 文件路径
+INFLOW_FILE   = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\3h入库流量过程线.csv"
+STORAGE_FILE  = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-库容曲线_linear.csv"
+DISCHARGE_FILE= r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-下泄流量曲线_linear.csv"
+OUT_FILE      = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\H1_动态规划调度.csv"
+
+# 2. 文件编码 'gbk' 'utf-8' 'latin1'
+INFLOW_ENCODING   = 'utf-8'
+STORAGE_ENCODING  = 'utf-8'
+DISCHARGE_ENCODING= 'utf-8'
+
+# 3. 初始状态
+INITIAL_Z = 38.0   # m
+
+# 4. 约束
+Z_LOWER     = 36.0   # 允许最低水位（m）
+Z_UPPER     = 41.0   # 允许最高水位（m）
+FINAL_Z_MAX = None   # 调度期末水位上限（m）；None=不限
+MIN_RELEASE = 0.0    # 最小下泄流量（m³/s）
+
+# 5. 动态规划参数
+N_STATES = 2000      # 库容离散状态数
+N_WORKERS = 1        # 进程数；1=单进程，>1 时按状态分块并行
+
+# 6. 输出字段
+OUT_COLS = ['时间t/h', '入库流量Q/(m³·s⁻¹)', '时段平均下泄流量/(m³·s⁻¹)', '水库存水量V/万m³', '水库水位Z/m']
+
+# ========== 工具函数 ==========
+def read_curves():
+    """读取两条曲线，返回 Z_sto, V_sto(m³), Z_dis, q_dis（查表用 fr.interp_extrap，两端线性外延）"""
+    return fr.read_curves(STORAGE_FILE, DISCHARGE_FILE, STORAGE_ENCODING, DISCHARGE_ENCODING)
+
+def read_inflow():
+    """读取入库流量过程"""
+    df = pd.read_csv(INFLOW_FILE, encoding=INFLOW_ENCODING)
+    t = df['时间t/h'].values
+    Q = df['Q/(m3/s-1)'].values
+    return t, Q
+
+def build_state_grid(Z_sto, V_sto):
+    """等间隔库容离散状态，以初始库容为基点向上下延伸至允许水位范围"""
+    V_lo, V_hi, V0 = fr.interp_extrap(np.array([Z_LOWER, Z_UPPER, INITIAL_Z]), Z_sto, V_sto).tolist()
+    if not V_lo <= V0 <= V_hi:
+        raise ValueError(f'初始水位 {INITIAL_Z} m 不在允许水位范围 [{Z_LOWER}, {Z_UPPER}] 内')
+    dV = (V_hi - V_lo) / (N_STATES - 1)
+    start = int(np.floor((V0 - V_lo) / dV))
+    V_grid = V0 + dV * (np.arange(start + int(np.floor((V_hi - V0) / dV)) + 1) - start)
+    return V_grid, dV, start
+
+# ========== 动态规划核心 ==========
+def stage_transition(cost_prev, cap, dV, Q_avg, dt, q_min, cols):
+    """
+    单个时段的状态转移（对 cols 指定的终止状态）
+    返回各终止状态的最优目标值与对应的起始状态下标
+    """
+    n = len(cost_prev)
+    # 带内状态差 k = a - b：最小下泄流量 ≤ q ≤ 最大泄流能力
+    k_lo = max(int(np.ceil((q_min - Q_avg) * dt / dV)), -(n - 1))
+    k_hi = min(int(np.floor((cap.max() - Q_avg) * dt / dV)), n - 1)
+    if k_lo > k_hi:
+        return np.full(len(cols), np.inf), np.zeros(len(cols), dtype=int)
+    k = np.arange(k_lo, k_hi + 1)
+    q = Q_avg + k * dV / dt                                       # 各状态差对应的时段平均下泄流量
+
+    a = cols[None, :] + k[:, None]                                # (状态差, 终止状态) → 起始状态
+    valid = (a >= 0) & (a < n)
+    a = np.clip(a, 0, n - 1)
+    feasible = valid & (q[:, None] >= q_min) & (q[:, None] <= 0.5 * (cap[a] + cap[cols][None, :]))
+    value = np.where(feasible, np.maximum(cost_prev[a], q[:, None]), np.inf)
+    best = np.argmin(value, axis=0)
+    r = np.arange(len(cols))
+    return value[best, r], a[best, r]
+
+def optimize(t_h, Q_in, V_grid, dV, cap, start, V_final_max=np.inf, pool=None):
+    """
+    正向递推、逆向回溯的动态规划
+    返回各时刻最优库容状态下标序列与最小的最大下泄流量
+    """
+    n = len(t_h)
+    n_states = len(V_grid)
+    cost = np.full(n_states, np.inf)
+    cost[start] = 0.0
+    policy = np.zeros((n, n_states), dtype=np.int32)
+    chunks = np.array_split(np.arange(n_states), N_WORKERS) if pool else None
+
+    for i in tqdm(range(1, n), desc="动态规划递推"):
+        dt = (t_h[i] - t_h[i-1]) * 3600
+        Q_avg = 0.5 * (Q_in[i-1] + Q_in[i])
+        if pool is None:
+            cost, policy[i] = stage_transition(cost, cap, dV, Q_avg, dt, MIN_RELEASE, np.arange(n_states))
+        else:
+            futures = [pool.submit(stage_transition, cost, cap, dV, Q_avg, dt, MIN_RELEASE, cols) for cols in chunks]
+            parts = [f.result() for f in futures]
+            cost = np.concatenate([p[0] for p in parts])
+            policy[i] = np.concatenate([p[1] for p in parts])
+
+    # 期末状态
+    final = np.where(V_grid <= V_final_max, cost, np.inf)
+    end = int(np.argmin(final))
+    if not np.isfinite(final[end]):
+        raise ValueError('在给定约束下不存在可行调度方案，请放宽水位或泄量约束')
+
+    # 回溯最优状态序列
+    path = np.empty(n, dtype=int)
+    path[-1] = end
+    for i in range(n - 1, 0, -1):
+        path[i-1] = policy[i, path[i]]
+    return path, final[end]
+
+# ========== 主流程 ==========
+def main():
+    t_h, Q_in = read_inflow()
+    Z_sto, V_sto, Z_dis, q_dis = read_curves()
+    V_grid, dV, start = build_state_grid(Z_sto, V_sto)
+    cap = fr.interp_extrap(fr.interp_extrap(V_grid, V_sto, Z_sto), Z_dis, q_dis)
+    V_final_max = float(fr.interp_extrap(FINAL_Z_MAX, Z_sto, V_sto)) if FINAL_Z_MAX is not None else np.inf
+    print(f"库容状态数：{len(V_grid)}，时段数：{len(t_h) - 1}，进程数：{N_WORKERS}")
+
+    if N_WORKERS > 1:
+        with ProcessPoolExecutor(max_workers=N_WORKERS) as pool:
+            path, peak = optimize(t_h, Q_in, V_grid, dV, cap, start, V_final_max, pool)
+    else:
+        path, peak = optimize(t_h, Q_in, V_grid, dV, cap, start, V_final_max)
+
+    V = V_grid[path]
+    q_avg = np.concatenate([[np.nan], 0.5 * (Q_in[:-1] + Q_in[1:]) - np.diff(V) / (np.diff(t_h) * 3600)])
+    results = pd.DataFrame({
+        '时间t/h': t_h,
+        '入库流量Q/(m³·s⁻¹)': Q_in,
+        '时段平均下泄流量/(m³·s⁻¹)': q_avg,
+        '水库存水量V/万m³': V * 1e-4,
+        '水库水位Z/m': fr.interp_extrap(V, V_sto, Z_sto),
+    })[OUT_COLS]
+    results.to_csv(OUT_FILE, index=False, encoding='utf-8-sig')
+    print(f"动态规划调度完成！最大下泄流量：{peak:.2f} m³/s，最高水位：{results['水库水位Z/m'].max():.2f} m")
+    print(f"结果已保存至：{OUT_FILE}")
+
+# ========== 运行 ==========
+if __name__ == '__main__':
+    main()
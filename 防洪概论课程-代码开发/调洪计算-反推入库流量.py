@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+水库调洪演算 —— 反推入库流量（由实测水位、下泄流量求入库流量）
+水量平衡：(Q1+Q2)/2 = (V2-V1)/Δt + (q1+q2)/2
+--------------------------------------------------
+实测水位经水位-库容曲线得 V，整个序列一次性差分求时段平均入库流量，
+无需逐时段试算；差分结果对水位观测噪声敏感，可选平滑处理
+时刻入库流量取相邻两时段平均入库流量的平均值（首尾时刻取相邻时段值）
+--------------------------------------------------
+单位约定（内部计算）：
+    水位 z：m
+    库容 V：m³（读取时立即把“万m³”→m³）
+    流量 Q/q：m³/s
+"""
+import numpy as np
+import pandas as pd
+import floodroute as fr
+
+# ========== 用户参数区 ==========
+# 1. 文件路径
+# 实测过程文件：至少包含 时间t/h、水库水位Z/m 两列；下泄流量列缺失时由水位-下泄流量曲线求得
+OBSERVED_FILE = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\实测数据\实测水位下泄流量过程.csv"
+STORAGE_FILE  = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-库容曲线_linear.csv"
+DISCHARGE_FILE= r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-下泄流量曲线_linear.csv"
+OUT_FILE      = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\F1_反推入库流量.csv"
+
+# 2. 文件编码 'gbk' 'utf-8' 'latin1'
+OBSERVED_ENCODING = 'utf-8'
+STORAGE_ENCODING  = 'utf-8'
+DISCHARGE_ENCODING= 'utf-8'
+
+# 3. 列名
+TIME_COL      = '时间t/h'
+LEVEL_COL     = '水库水位Z/m'
+OUTFLOW_COL   = '下泄流量q/(m³·s⁻¹)'   # 实测下泄流量列；文件中没有该列时按曲线计算
+
+# 4. 平滑参数
+SMOOTH_METHOD = None     # None=不平滑；'moving' 滑动平均；'savgol' Savitzky-Golay 滤波
+SMOOTH_WINDOW = 5        # 平滑窗口（时段数，奇数）
+SAVGOL_ORDER  = 2        # Savitzky-Golay 多项式阶数
+CLIP_NEGATIVE = True     # 是否把负的反推入库流量截为 0
+
+# ========== 工具函数 ==========
+def read_curves():
+    """读取两条曲线，返回 Z_sto, V_sto(m³), Z_dis, q_dis（查表用 fr.interp_extrap，两端线性外延）"""
+    return fr.read_curves(STORAGE_FILE, DISCHARGE_FILE, STORAGE_ENCODING, DISCHARGE_ENCODING)
+
+def read_observed(Z_dis, q_dis):
+    """读取实测过程，返回 t(h)、Z、q"""
+    df = pd.read_csv(OBSERVED_FILE, encoding=OBSERVED_ENCODING)
+    t = df[TIME_COL].values.astype(float)
+    Z = df[LEVEL_COL].values.astype(float)
+    if OUTFLOW_COL in df.columns:
+        q = df[OUTFLOW_COL].values.astype(float)
+    else:
+        print(f"未找到实测下泄流量列 {OUTFLOW_COL}，按水位-下泄流量曲线计算")
+        q = fr.interp_extrap(Z, Z_dis, q_dis)
+    return t, Z, q
+
+def smooth(x, method=None, window=5, order=2):
+    """对差分得到的入库流量序列做可选平滑"""
+    if method is None or len(x) < window:
+        return x
+    if method == 'moving':
+        # 居中滑动平均，两端按实际覆盖的点数求平均
+        kernel = np.ones(window)
+        return np.convolve(x, kernel, mode='same') / np.convolve(np.ones_like(x), kernel, mode='same')
+    if method == 'savgol':
+        from scipy.signal import savgol_filter
+        return savgol_filter(x, window, order, mode='interp')
+    raise ValueError(f'Unsupported smooth method: {method}')
+
+# ========== 反推核心 ==========
+def inverse_routing(t_h, Z, q, Z_sto, V_sto):
+    """
+    整体差分反推入库流量
+    返回 时段平均入库流量（长度 n-1，对应 t[i-1]~t[i]）与 时刻入库流量（长度 n）
+    """
+    V = fr.interp_extrap(Z, Z_sto, V_sto)
+    dt = np.diff(t_h) * 3600
+    if np.any(dt <= 0):
+        raise ValueError('时间列必须严格递增')
+    Q_avg = np.diff(V) / dt + 0.5 * (q[:-1] + q[1:])
+    Q_avg = smooth(Q_avg, SMOOTH_METHOD, SMOOTH_WINDOW, SAVGOL_ORDER)
+    if CLIP_NEGATIVE:
+        Q_avg = np.maximum(Q_avg, 0.0)
+
+    Q_point = np.empty(len(t_h))
+    Q_point[0], Q_point[-1] = Q_avg[0], Q_avg[-1]
+    Q_point[1:-1] = 0.5 * (Q_avg[:-1] + Q_avg[1:])
+    return Q_avg, Q_point, V
+
+# ========== 主流程 ==========
+def main():
+    Z_sto, V_sto, Z_dis, q_dis = read_curves()
+    t_h, Z, q = read_observed(Z_dis, q_dis)
+    Q_avg, Q_point, V = inverse_routing(t_h, Z, q, Z_sto, V_sto)
+
+    results = pd.DataFrame({
+        '时间t/h': t_h,
+        '水库水位Z/m': Z,
+        '水库存水量V/万m³': V * 1e-4,
+        '下泄流量q/(m³·s⁻¹)': q,
+        '时段平均入库流量/(m³·s⁻¹)': np.concatenate([[np.nan], Q_avg]),
+        '入库流量Q/(m³·s⁻¹)': Q_point,
+    })
+    results.to_csv(OUT_FILE, index=False, encoding='utf-8-sig')
+    print(f"反推入库流量完成！共 {len(t_h)} 个时刻，结果已保存至：{OUT_FILE}")
+    print(f"最大时段平均入库流量：{Q_avg.max():.2f} m³/s")
+
+# ========== 运行 ==========
+if __name__ == '__main__':
+    main()
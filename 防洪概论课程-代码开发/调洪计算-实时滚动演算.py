@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+水库调洪演算 —— 实时滚动演算（逐条接收入库流量）
+微分方程：dV/dt = Q(t) - q(z)，单步积分沿用四阶龙格-库塔法（RK4）
+--------------------------------------------------
+曲线只读取一次；演算器保存当前时刻的 t、Q、V、z、q，
+每收到一条新的入库流量记录只推进一个时段（与记录总数无关），
+可逐条/小批量送入，也可跟踪一个不断追加写入的 CSV 文件；
+重新运行时从输出文件最后一行恢复状态续算，已演算的记录不再重复写入
+--------------------------------------------------
+单位约定（内部计算）：
+    水位 z：m
+    库容 V：m³（读取时立即把“万m³”→m³）
+    流量 Q/q：m³/s
+输出时再把 V 转回“万m³”
+--------------------------------------------------
+曲线读取与 RK4 单步取自 floodroute 包，只加载 NumPy（不加载 pandas、scipy），
+由调度程序按需拉起时进程启动更快
+"""
+import os
+import time
+import floodroute as fr
+
+# ========== 用户参数区 ==========
+# 1. 文件路径
+INFLOW_FILE   = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\实时数据\入库流量实时记录.csv"
+STORAGE_FILE  = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-库容曲线_linear.csv"
+DISCHARGE_FILE= r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-下泄流量曲线_linear.csv"
+OUT_FILE      = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\E1_实时演算.csv"
+
+# 2. 文件编码 'gbk' 'utf-8' 'latin1'
+INFLOW_ENCODING   = 'utf-8'
+STORAGE_ENCODING  = 'utf-8'
+DISCHARGE_ENCODING= 'utf-8'
+
+# 3. 初始状态（对应第一条入库流量记录的时刻）
+INITIAL_Z = 38.0   # m
+INITIAL_V = 6450   # 万 m³
+
+# 4. 跟踪文件参数
+POLL_SECONDS = 5.0     # 检查新记录的间隔（秒）
+IDLE_TIMEOUT = None    # 连续无新记录多少秒后停止；None=一直跟踪，Ctrl+C 结束
+RESUME       = True    # True=从已有输出文件最后一行的状态续算，跳过已演算的记录；False=覆盖输出文件，从初始状态重新演算
+
+# 5. 输出字段
+OUT_COLS = ['时间t/h', '入库流量Q/(m³·s⁻¹)', '下泄流量q/(m³·s⁻¹)', '水库存水量V/万m³', '水库水位Z/m']
+
+# ========== 工具函数 ==========
+def read_curves():
+    """读取两条曲线，返回 V→z、V→q 查表函数与 z→q 查表函数"""
+    Z_sto, V_sto, Z_dis, q_dis = fr.read_curves(STORAGE_FILE, DISCHARGE_FILE, STORAGE_ENCODING, DISCHARGE_ENCODING)
+    V_z, V_q = fr.build_V_lookups(Z_sto, V_sto, Z_dis, q_dis)
+    return V_z, V_q, fr.make_lookup(Z_dis, q_dis)
+
+# ========== 滚动演算器 ==========
+class StreamingRouter:
+    """
+    有状态的滚动演算器
+    push(t, Q) 每次推进一个时段并返回新的一行 (t, Q, q, V万m³, z)；
+    第一条记录只确定初始时刻，返回初始状态行
+    """
+
+    def __init__(self, V_z, V_q, discharge, z0, V0):
+        self.V_z = V_z
+        self.V_q = V_q
+        self.t = None
+        self.Q = None
+        self.z = z0
+        self.V = V0 * 1e4          # 万m³ → m³
+        self.q = discharge(z0)
+        self.n_steps = 0
+
+    def row(self):
+        return self.t, self.Q, self.q, self.V * 1e-4, self.z
+
+    def resume(self, t, Q, q, V, z):
+        """从一条已输出的状态行 (t, Q, q, V万m³, z) 恢复，下一条记录接着推进（库容经万m³换算，与不中断运行只差舍入误差）"""
+        self.t, self.Q, self.q, self.V, self.z = t, Q, q, V * 1e4, z
+
+    def push(self, t, Q):
+        """接收一条入库流量记录（t：h，Q：m³/s），返回推进后的状态行"""
+        if self.t is not None:
+            dt = (t - self.t) * 3600
+            if dt <= 0:
+                raise ValueError(f'入库流量记录时间必须递增：{self.t} → {t}')
+            # 时段平均入库流量（梯形假设）
+            Q_avg = 0.5 * (self.Q + Q)
+            self.V, self.z, self.q = fr.rk4_step(self.V, (Q_avg, Q_avg, Q_avg), self.V_z, self.V_q, dt)
+            self.n_steps += 1
+        self.t, self.Q = t, Q
+        return self.row()
+
+    def push_many(self, records):
+        """逐条推进一批 (t, Q) 记录，依次产出状态行"""
+        for t, Q in records:
+            yield self.push(t, Q)
+
+# ========== 跟踪追加写入的 CSV ==========
+def follow_csv(path, encoding='utf-8', poll_seconds=5.0, idle_timeout=None):
+    """
+    跟踪一个不断追加写入的入库流量 CSV，按到达顺序产出 (t, Q)
+    记录文件读取位置，每次只解析新追加的完整行；末尾尚未写完的行留到下次读取
+    """
+    offset = 0
+    buffer = b''
+    col_t = col_Q = None
+    idle = 0.0
+    while True:
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size < offset:
+            raise RuntimeError(f'文件被截断或替换：{path}')
+        if size > offset:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                chunk = f.read(size - offset)
+            offset = size
+            idle = 0.0
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                text = line.decode(encoding).lstrip('\ufeff').strip()
+                if not text:
+                    continue
+                fields = [s.strip() for s in text.split(',')]
+                if col_t is None:
+                    # 表头：假设列名 时间t/h 与 Q/(m3/s-1)
+                    col_t, col_Q = fields.index('时间t/h'), fields.index('Q/(m3/s-1)')
+                    continue
+                yield float(fields[col_t]), float(fields[col_Q])
+        else:
+            if idle_timeout is not None and idle >= idle_timeout:
+                return
+            time.sleep(poll_seconds)
+            idle += poll_seconds
+
+# ========== 续算 ==========
+def last_output_row(path):
+    """
+    读取已有输出文件最后一条完整的状态行 (t, Q, q, V万m³, z)；文件不存在或只有表头时返回 None
+    上次运行中断留下的末尾半行直接截去
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        start = max(0, size - 4096)
+        f.seek(start)
+        tail = f.read()
+        end = tail.rfind(b'\n') + 1
+        if end < len(tail):
+            f.truncate(start + end)
+    for line in reversed(tail[:end].split(b'\n')):
+        text = line.decode('utf-8').lstrip('\ufeff').strip()
+        if text and not text.startswith(OUT_COLS[0]):
+            return tuple(float(s) for s in text.split(','))
+    return None
+
+# ========== 主流程 ==========
+def main():
+    V_z, V_q, discharge = read_curves()
+    router = StreamingRouter(V_z, V_q, discharge, INITIAL_Z, INITIAL_V)
+    records = follow_csv(INFLOW_FILE, INFLOW_ENCODING, POLL_SECONDS, IDLE_TIMEOUT)
+
+    state = last_output_row(OUT_FILE) if RESUME else None
+    if state is not None:
+        router.resume(*state)
+        records = ((t, Q) for t, Q in records if t > state[0])
+        print(f"从输出文件最后一行续算：t={state[0]:g} h 及之前的记录已演算，跳过")
+
+    write_header = not RESUME or not os.path.exists(OUT_FILE) or os.path.getsize(OUT_FILE) == 0
+    print(f"开始跟踪入库流量记录：{INFLOW_FILE}")
+    with open(OUT_FILE, 'a' if RESUME else 'w', encoding='utf-8-sig' if write_header else 'utf-8', newline='') as out:
+        if write_header:
+            out.write(','.join(OUT_COLS) + '\n')
+        try:
+            for t, Q, q, V, z in router.push_many(records):
+                out.write(f"{t},{Q},{q},{V},{z}\n")
+                out.flush()
+                print(f"t={t:g} h  Q={Q:.1f}  q={q:.1f} m³/s  V={V:.2f} 万m³  Z={z:.3f} m")
+        except KeyboardInterrupt:
+            print("已停止跟踪")
+    print(f"本次共推进 {router.n_steps} 个时段，结果已写入：{OUT_FILE}")
+
+# ========== 运行 ==========
+if __name__ == '__main__':
+    main()
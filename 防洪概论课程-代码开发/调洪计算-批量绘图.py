@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+调洪演算结果批量绘图 —— 非交互后端 + 图形模板复用 + 进程池并行
+--------------------------------------------------
+读取一批演算结果 CSV（试算法、RK4、蓄量指示法等脚本的输出），
+每个文件绘制一张上下布局的流量 / 水位过程线图（版式同 RK4 可视化脚本），保存为同名 PNG
+--------------------------------------------------
+使用 Agg 后端，不弹出窗口，可在无显示器的服务器上运行；
+画布、坐标轴与线条（floodroute.plotting.HydrographTemplate）在每个进程中只创建一次，之后各情景只替换数据、图例与坐标范围再保存；
+情景较多时按 N_WORKERS 分给进程池，绘图耗时随核数近似线性下降
+"""
+import os
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from floodroute.plotting import HydrographTemplate
+
+# ========== 用户参数区 ==========
+# 1. 输入结果文件（可用通配符）与输出目录
+RESULT_FILES = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\情景演算结果\*.csv"
+OUT_DIR      = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\情景演算图"
+RESULT_ENCODING = 'utf-8-sig'
+
+# 2. 结果列名（试算法、RK4 等脚本输出的列名）
+TIME_COL    = '时间t/h'
+INFLOW_COL  = '入库流量Q/(m³·s⁻¹)'
+OUTFLOW_COL = '下泄流量q/(m³·s⁻¹)'
+LEVEL_COL   = '水库水位Z/m'
+
+# 3. 并行进程数；1=单进程
+N_WORKERS = os.cpu_count() or 1
+
+# 4. 可视化参数
+FIG_SIZE = (10, 12)        # 上下布局
+DPI      = 150
+FONT_PATH= None            # 自定义中文字体路径；None=默认
+MAX_PLOT_POINTS = None     # 每条曲线最多绘制点数（LTTB 抽稀，峰值点总保留）；None=图宽像素数 FIG_SIZE[0]×DPI，0=不抽稀
+
+# ========== 绘图 ==========
+# 每个进程一份模板，首次绘图时创建
+_template = None
+
+def render_file(path):
+    """绘制单个结果文件，返回图片路径"""
+    global _template
+    if _template is None:
+        _template = HydrographTemplate(FIG_SIZE, font_path=FONT_PATH)
+    df = pd.read_csv(path, encoding=RESULT_ENCODING)
+    name = os.path.splitext(os.path.basename(path))[0]
+    save_path = os.path.join(OUT_DIR, name + '.png')
+    _template.render(df[TIME_COL].values, df[INFLOW_COL].values, df[OUTFLOW_COL].values,
+                     df[LEVEL_COL].values, name, save_path, DPI, MAX_PLOT_POINTS)
+    return save_path
+
+# ========== 主流程 ==========
+def main():
+    files = sorted(glob.glob(RESULT_FILES))
+    if not files:
+        print(f"没有找到结果文件：{RESULT_FILES}")
+        return
+    os.makedirs(OUT_DIR, exist_ok=True)
+    print(f"共 {len(files)} 个结果文件，进程数：{N_WORKERS}")
+
+    start = time.perf_counter()
+    if N_WORKERS > 1 and len(files) > 1:
+        chunksize = max(1, len(files) // (4 * N_WORKERS))
+        with ProcessPoolExecutor(max_workers=N_WORKERS) as pool:
+            saved = list(pool.map(render_file, files, chunksize=chunksize))
+    else:
+        saved = [render_file(path) for path in files]
+    print(f"批量绘图完成！{len(saved)} 张图片已保存至：{OUT_DIR}（耗时 {time.perf_counter() - start:.1f} s）")
+
+# ========== 运行 ==========
+if __name__ == '__main__':
+    main()
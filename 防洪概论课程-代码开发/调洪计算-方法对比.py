@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+水库调洪演算 —— 各演算方法精度与计算量对比
+对同一入库过程与同一组曲线，按不同时段长、不同容差运行各演算方法：
+    试算法（vector / brent）、蓄量指示法、定步长 RK4（时段平均 / 保单调三次入流）、隐式法（向后欧拉 / 梯形公式）、自适应步长 RK
+每次运行记录：耗时、曲线求值次数、最高水位与最大下泄流量相对参考解的误差、水量平衡闭合差
+参考解：自适应步长 RK45（保单调三次入流、极小容差），在 REFERENCE_DT_H 的细时刻上稠密输出
+--------------------------------------------------
+各方法直接调用同目录下对应脚本中的函数，脚本中的参数由本脚本统一覆盖
+单位约定（内部计算）：
+    水位 z：m
+    库容 V：m³（读取时立即把“万m³”→m³）
+    流量 Q/q：m³/s
+"""
+import os
+import time
+import importlib.util
+import numpy as np
+import pandas as pd
+from scipy.interpolate import PchipInterpolator
+from scipy.integrate import trapezoid
+import floodroute as fr
+from floodroute import plotting
+
+# ========== 用户参数区 ==========
+# 1. 文件路径
+INFLOW_FILE   = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\3h入库流量过程线.csv"
+STORAGE_FILE  = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-库容曲线_linear.csv"
+DISCHARGE_FILE= r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-下泄流量曲线_linear.csv"
+OUT_TABLE     = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\K1_方法对比.csv"
+OUT_FIGURE    = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\K1_方法对比.png"
+
+# 2. 文件编码 'gbk' 'utf-8' 'latin1'
+INFLOW_ENCODING   = 'utf-8'
+STORAGE_ENCODING  = 'utf-8'
+DISCHARGE_ENCODING= 'utf-8'
+
+# 3. 初始状态（初始库容、下泄流量由曲线求得，各方法一致）
+INITIAL_Z = 38.0   # m
+
+# 4. 对比范围
+TIME_STEPS_H = [6, 3, 1, 0.5]            # 演算时段长（h）；入库流量按保单调三次插值到各时段
+TRIAL_SETTINGS = [('vector', 1), ('vector', 2), ('brent', None)]   # 试算法（试算方式, 小数位数）；'grid' 与 'vector' 结果相同，耗时更长
+TRIAL_V_TOLERANCE = 3                    # 试算法库容容差（万m³）
+TRIAL_Z_RANGE = (36.0, 41.0)             # 试算法 / 蓄量指示法水位范围（m）
+RK4_SETTINGS = ['average', 'pchip']      # RK4 阶段入库流量
+IMPLICIT_SETTINGS = [('implicit_euler', 'pchip'), ('trapezoidal', 'pchip')]  # 隐式法（格式, 时段内入库流量）
+ADAPTIVE_SETTINGS = [('RK45', 1e4), ('RK45', 1e3), ('RK23', 1e3)]  # 自适应步长（方法, 库容绝对容差 m³）
+
+# 5. 参考解
+REFERENCE_DT_H = 0.05                    # 参考解输出间隔（h）
+REFERENCE_ATOL = 1e-2                    # 参考解库容绝对容差（m³）
+
+# 6. 可视化参数
+FIG_SIZE = (12, 5)
+DPI      = 200
+SHOW_FIGURE = True   # 保存对比图后是否显示；False=只写出 PNG
+
+# ========== 脚本加载 ==========
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_script(filename):
+    """按文件名加载同目录下的演算脚本（文件名含中文与连字符，不能直接 import）"""
+    spec = importlib.util.spec_from_file_location(os.path.splitext(filename)[0],
+                                                  os.path.join(SCRIPT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# ========== 工具函数 ==========
+def read_inputs():
+    """读取入库流量过程与两条曲线"""
+    flood = pd.read_csv(INFLOW_FILE, encoding=INFLOW_ENCODING)
+    sto = pd.read_csv(STORAGE_FILE,  encoding=STORAGE_ENCODING)
+    dis = pd.read_csv(DISCHARGE_FILE,encoding=DISCHARGE_ENCODING)
+    return flood['时间t/h'].values.astype(float), flood['Q/(m3/s-1)'].values.astype(float), sto, dis
+
+def resample_inflow(t_h, Q, dt_h):
+    """把入库流量按保单调三次插值到时段长 dt_h 的时刻上；历时不是 dt_h 整数倍时末时段取余下的时长，保留终点"""
+    t_new = np.arange(t_h[0], t_h[-1] + dt_h * 1e-6, dt_h)
+    if t_new[-1] < t_h[-1] - dt_h * 1e-6:
+        t_new = np.append(t_new, t_h[-1])
+    return t_new, PchipInterpolator(t_h, Q)(t_new)
+
+def mass_balance_error(t_h, Q, q, V):
+    """水量平衡闭合差：(期末库容变化 - 入库水量 + 出库水量) / 入库水量（梯形积分）"""
+    t_s = t_h * 3600
+    W_in = trapezoid(Q, t_s)
+    W_out = trapezoid(q, t_s)
+    return (V[-1] - V[0] - (W_in - W_out)) / W_in
+
+# ========== 各方法运行函数 ==========
+# 均返回 Z、q、V(m³) 数组与曲线求值次数（一次求值 = 一次由水位或库容求下泄流量的曲线计算）
+# 曲线文件在计时之外读取一次（RK 类方法传入 rk.read_curves() 的结果），耗时只计演算本身
+
+def run_trial(trial, sto, dis, t_h, Q, method, decimals):
+    """试算法：逐时段调用 TRIAL_METHODS 中的试算函数，找不到解时与连续演算模式相同取近似值"""
+    trial.search_method = method
+    if decimals is not None:
+        trial.decimal_places = decimals
+    trial.V_tolerance = TRIAL_V_TOLERANCE
+    trial.Z_search_min, trial.Z_search_max = TRIAL_Z_RANGE
+    storage_interp, discharge_interp, V_Z_interp = trial.create_interpolation_functions(sto, dis)
+    trial_func = trial.TRIAL_METHODS[method]
+
+    n = len(t_h)
+    Z = np.empty(n); q = np.empty(n); V = np.empty(n)
+    Z[0] = INITIAL_Z
+    q[0] = float(discharge_interp(INITIAL_Z))
+    V[0] = float(storage_interp(INITIAL_Z))          # 万m³
+    evaluations = 0
+    stats = {}
+    for i in range(1, n):
+        prev_row = {'下泄流量q/(m³·s⁻¹)': q[i-1], '水库存水量V/万m³': V[i-1], '水库水位Z/m': Z[i-1]}
+        avg_Q = 0.5 * (Q[i-1] + Q[i])
+        time_diff = t_h[i] - t_h[i-1]
+        best_Z, best_q, best_avg_q, best_delta_V, best_V, min_error = trial_func(
+            i, prev_row, storage_interp, discharge_interp, V_Z_interp, avg_Q, time_diff, stats=stats)
+        evaluations += stats['evaluations']
+        if best_Z is not None:
+            Z[i], q[i], V[i] = best_Z, best_q, best_V
+        else:
+            q[i] = float(discharge_interp(Z[i-1]))
+            V[i] = V[i-1] + (avg_Q - 0.5 * (q[i-1] + q[i])) * time_diff * 3600 * trial.unit_conversion
+            Z[i] = float(V_Z_interp(V[i]))
+            evaluations += 1
+    return Z, q, V / trial.unit_conversion, evaluations
+
+def run_puls(puls, sto, dis, t_h, Q):
+    """蓄量指示法：每时段一次关系表查算"""
+    puls.Z_table_min, puls.Z_table_max = TRIAL_Z_RANGE
+    Z_nodes, V_nodes, q_nodes = puls.create_curve_table(sto, dis)
+    puls.initial_Z = INITIAL_Z
+    puls.initial_V = float(np.interp(INITIAL_Z, Z_nodes, V_nodes))
+    puls.initial_discharge = float(np.interp(INITIAL_Z, Z_nodes, q_nodes))
+    avg_Q, q, avg_q, delta_V, V, Z = puls.route_storage_indication(t_h, Q, Z_nodes, V_nodes, q_nodes)
+    return Z, q, V / puls.unit_conversion, len(t_h) - 1
+
+def run_fixed_step(curves, t_h, Q, inflow_interp, solver='rk4'):
+    """定步长 RK4 / 隐式法：时段长取相邻时刻之差，求值次数取自各步记录"""
+    Z_sto, V_sto, Z_dis, q_dis = curves
+    V_z, V_q = fr.build_V_lookups(Z_sto, V_sto, Z_dis, q_dis)
+    dt = np.diff(t_h) * 3600
+    Q_start, Q_mid, Q_end = fr.inflow_stages(t_h, Q, inflow_interp)
+    n = len(t_h)
+    step = fr.STEP_FUNCTIONS[solver]
+    V = np.empty(n)
+    V[0] = fr.make_lookup(Z_sto, V_sto)(INITIAL_Z)
+    stats, evaluations = {}, 0
+    for i in range(1, n):
+        V[i] = step(V[i-1], (Q_start[i-1], Q_mid[i-1], Q_end[i-1]), V_z, V_q, dt[i-1], stats)[0]
+        evaluations += stats['evaluations']
+    return np.array([V_z(v) for v in V]), np.array([V_q(v) for v in V]), V, evaluations
+
+def run_adaptive(rk, curves, t_h, Q, method, atol, rtol=1e-6, inflow_interp='linear'):
+    """自适应步长 RK：结果取自稠密输出"""
+    rk.ADAPTIVE_METHOD, rk.V_ATOL, rk.V_RTOL, rk.INFLOW_INTERP = method, atol, rtol, inflow_interp
+    Z_sto, V_sto, Z_dis, q_dis = curves
+    V_z, V_q = fr.build_V_lookups(Z_sto, V_sto, Z_dis, q_dis)
+    V, Z, q, nfev = rk.route_adaptive(t_h, Q, fr.make_lookup(Z_sto, V_sto)(INITIAL_Z), V_z, V_q)
+    return Z, q, V, nfev
+
+# ========== 可视化 ==========
+def plot_comparison(table, save_path):
+    plt = plotting.pyplot(SHOW_FIGURE)
+    fig, axes = plt.subplots(1, 2, figsize=FIG_SIZE)
+    for (family, setting), group in table.groupby(['方法', '设置'], sort=False):
+        err = group['最高水位误差/m'].abs().clip(lower=1e-6)
+        label = f'{family} {setting}'.strip()
+        axes[0].loglog(group['求值次数'], err, 'o-', label=label)
+        axes[1].loglog(group['耗时/s'].clip(lower=1e-5), err, 'o-', label=label)
+    axes[0].set_xlabel('曲线求值次数')
+    axes[1].set_xlabel('耗时 / s')
+    for ax in axes:
+        ax.set_ylabel('最高水位误差绝对值 / m')
+        ax.grid(True, which='both', alpha=0.3)
+    axes[0].set_title('精度-求值次数')
+    axes[1].set_title('精度-耗时')
+    axes[1].legend(fontsize=8)
+    plt.tight_layout()
+    plt.savefig(save_path, dpi=DPI, bbox_inches='tight')
+    print(f"对比图已保存：{save_path}")
+    if SHOW_FIGURE:
+        plt.show()
+    plt.close(fig)
+
+# ========== 主流程 ==========
+def main():
+    t_src, Q_src, sto, dis = read_inputs()
+
+    trial = load_script('调洪计算-试算法.py')
+    puls = load_script('调洪计算-蓄量指示法.py')
+    rk = load_script('调洪计算-龙格-库数值解法.py')
+    rk.STORAGE_FILE, rk.DISCHARGE_FILE = STORAGE_FILE, DISCHARGE_FILE
+    rk.STORAGE_ENCODING, rk.DISCHARGE_ENCODING = STORAGE_ENCODING, DISCHARGE_ENCODING
+    curves = rk.read_curves()
+
+    # 参考解
+    t_ref, Q_ref = resample_inflow(t_src, Q_src, REFERENCE_DT_H)
+    Z_ref, q_ref, V_ref, _ = run_adaptive(rk, curves, t_ref, Q_ref, 'RK45', REFERENCE_ATOL, rtol=1e-10, inflow_interp='pchip')
+    print(f"参考解：最高水位 {Z_ref.max():.4f} m，最大下泄流量 {q_ref.max():.3f} m³/s")
+
+    rows = []
+    for dt_h in TIME_STEPS_H:
+        t_h, Q = resample_inflow(t_src, Q_src, dt_h)
+        # (方法, 设置, 运行函数, 参数)
+        runs = [('试算法', method if decimals is None else f'{method} {decimals}位',
+                 run_trial, (trial, sto, dis, t_h, Q, method, decimals))
+                for method, decimals in TRIAL_SETTINGS]
+        runs.append(('蓄量指示法', '', run_puls, (puls, sto, dis, t_h, Q)))
+        runs += [('RK4', kind, run_fixed_step, (curves, t_h, Q, kind)) for kind in RK4_SETTINGS]
+        runs += [('隐式法', f'{solver} {kind}', run_fixed_step, (curves, t_h, Q, kind, solver))
+                 for solver, kind in IMPLICIT_SETTINGS]
+        runs += [('自适应RK', f'{method} {atol:g}m³', run_adaptive, (rk, curves, t_h, Q, method, atol))
+                 for method, atol in ADAPTIVE_SETTINGS]
+
+        for family, setting, run, args in runs:
+            start = time.perf_counter()
+            Z, q, V, evaluations = run(*args)
+            elapsed = time.perf_counter() - start
+            rows.append({
+                '方法': family, '设置': setting, '时段长/h': dt_h,
+                '耗时/s': elapsed, '求值次数': evaluations,
+                '最高水位误差/m': Z.max() - Z_ref.max(),
+                '最大下泄流量误差/(m³·s⁻¹)': q.max() - q_ref.max(),
+                '水位最大偏差/m': np.abs(Z - np.interp(t_h, t_ref, Z_ref)).max(),
+                '水量平衡闭合差': mass_balance_error(t_h, Q, q, V),
+            })
+            print(f"  Δt={dt_h:g} h  {family} {setting}：耗时 {elapsed:.3f} s，求值 {evaluations} 次，"
+                  f"最高水位误差 {rows[-1]['最高水位误差/m']:+.4f} m")
+
+    table = pd.DataFrame(rows)
+    table.to_csv(OUT_TABLE, index=False, encoding='utf-8-sig')
+    print(f"对比结果已保存至：{OUT_TABLE}")
+    plot_comparison(table, OUT_FIGURE)
+
+# ========== 运行 ==========
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+梯级联合演算 —— 水库调洪（蓄量指示法）+ 河段马斯京根演算
+--------------------------------------------------
+按节点配置把水库节点与马斯京根河段节点连成一个演算网络：
+    每个节点的入流 = 上游节点出流之和 + 外部入流（区间入流等）之和
+节点按依赖关系分层，同一层的节点互不依赖，可交给进程池并行；
+节点之间直接传递数组，不再经过 CSV 中转
+--------------------------------------------------
+马斯京根法：Q[i] = C0·I[i] + C1·I[i-1] + C2·Q[i-1]
+    C0 = (0.5Δt - KX)/(K - KX + 0.5Δt)
+    C1 = (0.5Δt + KX)/(K - KX + 0.5Δt)
+    C2 = (K - KX - 0.5Δt)/(K - KX + 0.5Δt)
+单位：水位 m，库容 m³（读取时“万m³”→m³），流量 m³/s，K 与 Δt 均为小时
+演算函数取自 floodroute 包，只加载 NumPy（不加载 pandas、scipy），适合被调度程序频繁调用
+"""
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import floodroute as fr
+
+# ========== 用户参数区 ==========
+# 1. 外部入流过程（时间t/h, Q/(m3/s-1)），第一个文件的时间作为公共时间轴
+EXTERNAL_INFLOWS = {
+    '上库入库': r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\3h入库流量过程线.csv",
+    '区间入流': r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\区间入流过程线.csv",
+}
+INFLOW_ENCODING = 'utf-8'
+
+# 2. 节点配置（upstream 可填其他节点名或外部入流名）
+NODES = {
+    '上库': {
+        'type': 'reservoir',
+        'upstream': ['上库入库'],
+        'storage_file':   r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-库容曲线_linear.csv",
+        'discharge_file': r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-下泄流量曲线_linear.csv",
+        'initial_Z': 38.0,
+    },
+    '区间河段': {
+        'type': 'muskingum',
+        'upstream': ['上库'],
+        'K': 1.1002,          # 河段传播时间（h）
+        'X': 0.27,            # 流量比重因子（0-0.5）
+        'initial_Q': None,    # 初始出流；None=取初始入流
+    },
+    '下库': {
+        'type': 'reservoir',
+        'upstream': ['区间河段', '区间入流'],
+        'storage_file':   r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\下库插值水位-库容曲线_linear.csv",
+        'discharge_file': r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\下库插值水位-下泄流量曲线_linear.csv",
+        'initial_Z': 38.0,
+    },
+}
+CURVE_ENCODING = 'utf-8'
+
+# 3. 并行进程数；1=单进程
+N_WORKERS = 1
+
+# 4. 输出文件
+OUT_FILE = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\J1_梯级联合演算.csv"
+
+# ========== 节点演算 ==========
+def route_reservoir(t_h, Q_in, config):
+    """水库节点：蓄量指示法，返回 {出流, 水位}"""
+    curves = fr.read_curves(config['storage_file'], config['discharge_file'], CURVE_ENCODING)
+    z, q, _ = fr.route_storage_indication(t_h, Q_in, config['initial_Z'], *fr.indication_nodes(*curves))
+    return {'出流': q, '水位': z}
+
+def route_muskingum(t_h, I, config):
+    """河段节点：马斯京根法（等时段），返回 {出流}"""
+    return {'出流': fr.route_muskingum(t_h, I, config['K'], config['X'], config.get('initial_Q'))}
+
+NODE_TYPES = {
+    'reservoir': route_reservoir,
+    'muskingum': route_muskingum,
+}
+
+def run_node(node_type, t_h, inflow, config):
+    return NODE_TYPES[node_type](t_h, inflow, config)
+
+# ========== 网络组织 ==========
+def read_external_inflows():
+    """读取外部入流，统一插值到第一个文件的时间轴"""
+    series = {}
+    t_h = None
+    for name, path in EXTERNAL_INFLOWS.items():
+        t, Q = fr.read_table(path, ['时间t/h', 'Q/(m3/s-1)'], INFLOW_ENCODING)
+        if t_h is None:
+            t_h = t
+        series[name] = Q if np.array_equal(t, t_h) else np.interp(t_h, t, Q)
+    return t_h, series
+
+def topological_levels(nodes, external):
+    """按依赖关系分层：每层节点只依赖外部入流与前面各层的节点"""
+    for name, config in nodes.items():
+        for up in config['upstream']:
+            if up not in nodes and up not in external:
+                raise KeyError(f'节点 {name} 的上游 {up} 既不是节点也不是外部入流')
+    levels, done = [], set()
+    while len(done) < len(nodes):
+        level = [name for name, config in nodes.items() if name not in done
+                 and all(up in done or up in external for up in config['upstream'])]
+        if not level:
+            raise ValueError(f'节点之间存在循环依赖：{sorted(set(nodes) - done)}')
+        levels.append(level)
+        done.update(level)
+    return levels
+
+def simulate(t_h, external, pool=None):
+    """逐层演算整个网络，返回 {节点名: {出流, 水位...}}"""
+    results = {}
+    for level in topological_levels(NODES, external):
+        inflows = {}
+        for name in level:
+            inflows[name] = sum(results[up]['出流'] if up in results else external[up]
+                                for up in NODES[name]['upstream'])
+        if pool is None or len(level) == 1:
+            for name in level:
+                results[name] = run_node(NODES[name]['type'], t_h, inflows[name], NODES[name])
+        else:
+            futures = {name: pool.submit(run_node, NODES[name]['type'], t_h, inflows[name], NODES[name])
+                       for name in level}
+            for name, future in futures.items():
+                results[name] = future.result()
+        print(f"已完成：{'、'.join(level)}")
+    return results
+
+# ========== 主流程 ==========
+def main():
+    t_h, external = read_external_inflows()
+    if N_WORKERS > 1:
+        with ProcessPoolExecutor(max_workers=N_WORKERS) as pool:
+            results = simulate(t_h, external, pool)
+    else:
+        results = simulate(t_h, external)
+
+    out = {'时间t/h': t_h}
+    for name, series in external.items():
+        out[f'{name}/(m³·s⁻¹)'] = series
+    for name in NODES:
+        out[f'{name}出流/(m³·s⁻¹)'] = results[name]['出流']
+        if '水位' in results[name]:
+            out[f'{name}水位Z/m'] = results[name]['水位']
+    fr.write_table(OUT_FILE, out)
+    print(f"梯级联合演算完成！结果已保存至：{OUT_FILE}")
+    for name in NODES:
+        print(f"  {name}：最大出流 {results[name]['出流'].max():.1f} m³/s")
+
+# ========== 运行 ==========
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+水库调洪演算 —— 蓄量指示法（Modified Puls）
+水量平衡：(Q1+Q2)/2 - (q1+q2)/2 = (V2-V1)/Δt
+整理得：2V2/Δt + q2 = (Q1+Q2) + 2V1/Δt - q1
+--------------------------------------------------
+由水位-库容曲线与水位-下泄流量曲线预先生成 2V/Δt+q ~ Z、q、V 的单调关系表，
+逐时段只需一次查表，无需试算或迭代；输出列与 调洪计算-试算法.py 相同
+演算核心为 floodroute.route_storage_indication（与梯级联合演算、集合批量演算共用）
+"""
+import pandas as pd
+import numpy as np
+import os
+import floodroute as fr
+
+# ================================
+# 用户参数设置区域
+# ================================
+
+# 输入文件路径
+flood_process_file = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\3h入库流量过程线.csv"  # 入库流量过程线文件
+storage_curve_file = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-库容曲线_linear.csv"  # 水位-库容曲线文件
+discharge_curve_file = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-下泄流量曲线_linear.csv"  # 水位-下泄流量曲线文件
+flood_encoding = 'utf-8'  # 读取格式 文件编码 'gbk' 'utf-8' 'latin1'
+storage_curve_encoding = 'utf-8'
+discharge_curve_encoding = 'utf-8'
+# 输出文件路径
+output_file = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\C1_蓄量指示法.csv"
+
+# 第一行初始值
+initial_discharge = 173.9  # 下泄流量第一行数值
+initial_V = 6450  # 水库存水量第一行数值（万m³）
+initial_Z = 38.0  # 水库水位第一行数值（m）
+
+# 计算参数
+unit_conversion = 0.0001  # 单位换算值 (m³到万m³的转换)
+
+# 关系表参数
+Z_table_min = 36.0  # 关系表水位下限（超出曲线范围部分按曲线线性外延）
+Z_table_max = 41.0  # 关系表水位上限
+
+
+# ================================
+# 数据读取和预处理
+# ================================
+
+def read_data():
+    """读取所有输入数据"""
+    try:
+        # 读取入库洪水过程线
+        flood_data = pd.read_csv(flood_process_file, encoding=flood_encoding)
+        print(f"成功读取入库洪水过程线数据，共{len(flood_data)}行")
+
+        # 读取水位-库容曲线
+        storage_curve = pd.read_csv(storage_curve_file, encoding=storage_curve_encoding)
+        print(f"成功读取水位-库容曲线数据，共{len(storage_curve)}行")
+
+        # 读取水位-下泄流量曲线
+        discharge_curve = pd.read_csv(discharge_curve_file, encoding=discharge_curve_encoding)
+        print(f"成功读取水位-下泄流量曲线数据，共{len(discharge_curve)}行")
+
+        return flood_data, storage_curve, discharge_curve
+    except Exception as e:
+        print(f"读取数据时出错: {e}")
+        return None, None, None
+
+
+def create_curve_table(storage_curve, discharge_curve):
+    """
+    生成水位节点上的库容（万m³）、下泄流量表
+    节点取两条曲线水位的并集（加上关系表上下限），两曲线在节点间均为线性，
+    因此由节点表线性查得的结果与原曲线插值完全一致
+    """
+    return fr.indication_nodes(storage_curve['水位Z/m'].values, storage_curve['库容V/万m3'].values,
+                               discharge_curve['水位Z/m'].values, discharge_curve['下泄流量q/(m3·s)'].values,
+                               Z_table_min, Z_table_max)
+
+
+# ================================
+# 主计算函数
+# ================================
+
+def route_storage_indication(t, Q, Z_nodes, V_nodes, q_nodes):
+    """
+    蓄量指示法逐时段演算（V_nodes 为万m³）
+    t 为时间（h），Q 为入库流量（m³/s）；不同时段长的关系表只生成一次并缓存
+    返回与试算法相同含义的各列数组
+    """
+    Z, q, V = fr.route_storage_indication(t, Q, initial_Z, Z_nodes, V_nodes / unit_conversion, q_nodes,
+                                          V0=initial_V / unit_conversion, q0=initial_discharge)
+    V = V * unit_conversion
+    avg_Q = np.zeros(len(t))
+    avg_q = np.zeros(len(t))
+    delta_V = np.zeros(len(t))
+    avg_Q[1:] = (Q[:-1] + Q[1:]) / 2
+    avg_q[1:] = (q[:-1] + q[1:]) / 2
+    delta_V[1:] = np.diff(V)
+    return avg_Q, q, avg_q, delta_V, V, Z
+
+
+def calculate_flood_routing():
+    """主计算函数"""
+    # 读取数据
+    flood_data, storage_curve, discharge_curve = read_data()
+    if flood_data is None:
+        return False
+
+    # 预先生成关系表
+    Z_nodes, V_nodes, q_nodes = create_curve_table(storage_curve, discharge_curve)
+    print(f"关系表节点数：{len(Z_nodes)}")
+
+    t = flood_data['时间t/h'].values
+    Q = flood_data['Q/(m3/s-1)'].values
+
+    print("开始进行蓄量指示法调洪演算...")
+    try:
+        avg_Q, q, avg_q, delta_V, V, Z = route_storage_indication(t, Q, Z_nodes, V_nodes, q_nodes)
+    except ValueError as e:
+        print(f"计算出错: {e}")
+        return False
+
+    results = pd.DataFrame({
+        '时间t/h': t,
+        '入库流量Q/(m³·s⁻¹)': Q,
+        '时段平均入库流量/(m³·s⁻¹)': avg_Q,
+        '下泄流量q/(m³·s⁻¹)': q,
+        '时段平均下泄流量/(m³·s⁻¹)': avg_q,
+        '时段内水库存水量变化ΔV/万m³': delta_V,
+        '水库存水量V/万m³': V,
+        '水库水位Z/m': Z
+    })
+
+    # 保存结果
+    try:
+        results.to_csv(output_file, index=False, encoding='utf-8-sig')
+        print(f"\n计算完成！")
+        print(f"结果已保存到: {output_file}")
+        print(f"结果文件包含{len(results)}行数据")
+
+        # 显示结果统计
+        print("\n结果统计:")
+        print(f"最高水位: {Z.max():.2f} m")
+        print(f"最终库容: {V[-1]:.2f} 万m³")
+        print(f"最大下泄流量: {q.max():.2f} m³/s")
+
+        return True
+    except Exception as e:
+        print(f"保存结果时出错: {e}")
+        return False
+
+
+# ================================
+# 参数验证函数
+# ================================
+
+def validate_parameters():
+    """验证输入参数"""
+    errors = []
+
+    # 检查文件是否存在
+    if not os.path.exists(flood_process_file):
+        errors.append(f"入库洪水过程线文件不存在: {flood_process_file}")
+    if not os.path.exists(storage_curve_file):
+        errors.append(f"水位-库容曲线文件不存在: {storage_curve_file}")
+    if not os.path.exists(discharge_curve_file):
+        errors.append(f"水位-下泄流量曲线文件不存在: {discharge_curve_file}")
+
+    # 检查参数范围
+    if Z_table_min >= Z_table_max:
+        errors.append("关系表水位下限必须小于上限")
+
+    if unit_conversion <= 0:
+        errors.append("单位换算值必须大于0")
+
+    return errors
+
+
+# ================================
+# 主程序
+# ================================
+
+if __name__ == "__main__":
+    print("水库调洪演算（蓄量指示法）程序开始运行...")
+    print("=" * 50)
+
+    # 验证参数
+    validation_errors = validate_parameters()
+    if validation_errors:
+        print("参数验证错误:")
+        for error in validation_errors:
+            print(f"  - {error}")
+        print("请修改参数后重新运行程序。")
+    else:
+        print("参数验证通过")
+        success = calculate_flood_routing()
+
+        if success:
+            print("程序运行成功！")
+        else:
+            print("程序运行失败，请检查输入参数和文件路径。")
+
+    print("=" * 50)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+水库调洪演算 —— 设计参数搜索（起调水位 / 溢洪道净宽）
+以蓄量指示法为演算核心，对一个设计参数做二分搜索，使设计洪水的最高水位不超过控制水位：
+    起调水位 initial_Z：最高水位随起调水位升高而升高，求满足要求的最高起调水位
+    溢洪道净宽 spillway_width：最高水位随净宽增大而降低，求满足要求的最小净宽
+--------------------------------------------------
+水位节点上的库容表、单宽堰流表只生成一次，各次演算之间复用；
+可选用堰流公式 q = m·B·√(2g)·H^1.5 代替水位-下泄流量曲线；
+演算核心为 floodroute.route_storage_indication_peaks，水位超出节点范围的时段按边界取值并在搜索记录中标出
+--------------------------------------------------
+单位约定（内部计算）：
+    水位 z：m
+    库容 V：m³（读取时立即把“万m³”→m³）
+    流量 Q/q：m³/s
+"""
+import numpy as np
+import pandas as pd
+import floodroute as fr
+
+# ========== 用户参数区 ==========
+# 1. 文件路径
+INFLOW_FILE   = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\3h入库流量过程线.csv"
+STORAGE_FILE  = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-库容曲线_linear.csv"
+DISCHARGE_FILE= r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-下泄流量曲线_linear.csv"
+OUT_FILE      = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\I1_设计参数搜索.csv"
+
+# 2. 文件编码 'gbk' 'utf-8' 'latin1'
+INFLOW_ENCODING   = 'utf-8'
+STORAGE_ENCODING  = 'utf-8'
+DISCHARGE_ENCODING= 'utf-8'
+
+# 3. 搜索设置
+SEARCH_PARAM = 'initial_Z'      # 'initial_Z' 起调水位；'spillway_width' 溢洪道净宽（需 USE_WEIR_CURVE=True）
+SEARCH_RANGE = (36.0, 40.0)     # 搜索区间（m）
+CHECK_Z      = 40.5             # 控制水位（m），最高水位不得超过
+TOLERANCE    = 0.001            # 搜索精度（m）
+MAX_ITER     = 60
+
+# 4. 固定参数（搜索的参数以搜索值为准）
+INITIAL_Z = 38.0                # 起调水位（m）
+
+# 5. 堰流公式泄流曲线
+USE_WEIR_CURVE = False          # True=用堰流公式代替水位-下泄流量曲线
+WEIR_CREST     = 38.0           # 堰顶高程（m）
+WEIR_COEF      = 0.48           # 流量系数 m
+SPILLWAY_WIDTH = 20.0           # 溢洪道净宽 B（m）
+
+# 6. 水位节点（Z_NODE_MAX 须高于控制水位，演算水位触及节点上限时最高水位只是下限值）
+Z_NODE_MIN  = 36.0
+Z_NODE_MAX  = 41.0
+Z_NODE_STEP = 0.01
+
+# ========== 工具函数 ==========
+def read_curves():
+    """读取两条曲线，返回 Z_sto, V_sto(m³), Z_dis, q_dis"""
+    return fr.read_curves(STORAGE_FILE, DISCHARGE_FILE, STORAGE_ENCODING, DISCHARGE_ENCODING)
+
+def read_inflow():
+    """读取入库流量过程"""
+    return fr.read_table(INFLOW_FILE, ['时间t/h', 'Q/(m3/s-1)'], INFLOW_ENCODING)
+
+def weir_unit_discharge(Z_nodes):
+    """单宽堰流量 m·√(2g)·H^1.5（m³/s per m），堰顶以下为 0"""
+    H = np.maximum(Z_nodes - WEIR_CREST, 0.0)
+    return WEIR_COEF * np.sqrt(2 * 9.81) * H ** 1.5
+
+# ========== 演算核心 ==========
+def route_peak(t_h, Q_in, Z0, Z_nodes, V_nodes, q_nodes):
+    """
+    蓄量指示法演算，返回最高水位、最大下泄流量与超出水位节点范围的时段数
+    """
+    return fr.route_storage_indication_peaks(t_h, Q_in, Z0, Z_nodes, V_nodes, q_nodes, warn=False)
+
+def bisection_search(evaluate, lo, hi, increasing):
+    """
+    二分搜索满足 最高水位 ≤ CHECK_Z 的边界值
+    increasing=True：最高水位随参数增大而升高，求满足要求的最大值；否则求最小值
+    返回 (最优参数值, 搜索记录)
+    """
+    history = []
+
+    def check(x):
+        z_max, q_max, n_out = evaluate(x)
+        ok = z_max <= CHECK_Z
+        history.append((x, z_max, q_max, ok, n_out))
+        return ok
+
+    ok_lo, ok_hi = check(lo), check(hi)
+    good, bad = (lo, hi) if increasing else (hi, lo)
+    ok_good, ok_bad = (ok_lo, ok_hi) if increasing else (ok_hi, ok_lo)
+    if not ok_good:
+        return None, history
+    if ok_bad:
+        return bad, history
+
+    for _ in range(MAX_ITER):
+        if abs(bad - good) <= TOLERANCE:
+            break
+        mid = 0.5 * (good + bad)
+        if check(mid):
+            good = mid
+        else:
+            bad = mid
+    return good, history
+
+# ========== 主流程 ==========
+def main():
+    if not CHECK_Z < Z_NODE_MAX:
+        raise ValueError(f'控制水位 CHECK_Z={CHECK_Z} m 须低于水位节点上限 Z_NODE_MAX={Z_NODE_MAX} m')
+    t_h, Q_in = read_inflow()
+    Z_sto, V_sto, Z_dis, q_dis = read_curves()
+
+    # 只生成一次的水位节点表（超出曲线范围部分按曲线线性外延）
+    Z_nodes = np.round(np.arange(Z_NODE_MIN, Z_NODE_MAX + Z_NODE_STEP / 2, Z_NODE_STEP), 6)
+    V_nodes = fr.interp_extrap(Z_nodes, Z_sto, V_sto)
+    if USE_WEIR_CURVE:
+        unit_q = weir_unit_discharge(Z_nodes)
+        q_nodes = SPILLWAY_WIDTH * unit_q
+    else:
+        q_nodes = fr.interp_extrap(Z_nodes, Z_dis, q_dis)
+
+    if SEARCH_PARAM == 'initial_Z':
+        evaluate = lambda z0: route_peak(t_h, Q_in, z0, Z_nodes, V_nodes, q_nodes)
+        increasing, label = True, '起调水位/m'
+    elif SEARCH_PARAM == 'spillway_width':
+        if not USE_WEIR_CURVE:
+            raise ValueError('搜索溢洪道净宽时需设置 USE_WEIR_CURVE = True')
+        evaluate = lambda B: route_peak(t_h, Q_in, INITIAL_Z, Z_nodes, V_nodes, B * unit_q)
+        increasing, label = False, '溢洪道净宽/m'
+    else:
+        raise ValueError(f'Unsupported search param: {SEARCH_PARAM}')
+
+    best, history = bisection_search(evaluate, *SEARCH_RANGE, increasing)
+
+    records = pd.DataFrame(history, columns=[label, '最高水位Z/m', '最大下泄流量q/(m³·s⁻¹)', '满足控制水位',
+                                             '超出节点范围时段数'])
+    records.to_csv(OUT_FILE, index=False, encoding='utf-8-sig')
+    print(f"共演算 {len(history)} 次，搜索记录已保存至：{OUT_FILE}")
+    n_clamped = np.count_nonzero(records['超出节点范围时段数'])
+    if n_clamped:
+        print(f"警告：{n_clamped} 次演算的水位超出节点范围[{Z_NODE_MIN}, {Z_NODE_MAX}]，已按边界取值，"
+              f"其最高水位、最大下泄流量不可靠（触及上限时仍判为不满足控制水位）")
+    if best is None:
+        print(f"搜索区间 {SEARCH_RANGE} 内没有满足最高水位 ≤ {CHECK_Z} m 的{label}")
+    else:
+        z_max, q_max, n_out = evaluate(best)
+        if n_out:
+            raise ValueError(f'搜索结果 {best:.4f} 的演算有 {n_out} 个时段水位超出节点范围[{Z_NODE_MIN}, {Z_NODE_MAX}]，'
+                             f'请扩大 Z_NODE_MIN / Z_NODE_MAX')
+        print(f"{label}：{best:.4f}（最高水位 {z_max:.3f} m，最大下泄流量 {q_max:.1f} m³/s，控制水位 {CHECK_Z} m）")
+
+# ========== 运行 ==========
+if __name__ == '__main__':
+    main()
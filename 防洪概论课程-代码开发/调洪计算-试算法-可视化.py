@@ -1,17 +1,9 @@
-import pandas as pd
-import numpy as np
-from scipy.interpolate import interp1d
-from tqdm import tqdm
 import os
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
+import importlib.util
 import warnings
+from floodroute import plotting
 warnings.filterwarnings('ignore')
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['Microsoft YaHei']  # 用来正常显示中文标签 'Microsoft YaHei', 'SimHei', 'SimSun', 'Arial Unicode MS', 'DejaVu Sans'
-plt.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
-
 # ================================
 # 用户参数设置区域
 # ================================
@@ -28,6 +20,9 @@ output_file = "E:\水电202303班\大三（上期）\课程报告或小组作业
 
 # 可视化输出路径
 visualization_output = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\试算法-结果可视化.png"
+show_figure = True  # 结果图保存后是否显示
+cache_dir = None  # 演算结果缓存目录（与 调洪计算-试算法.py 共用，输入文件与演算参数未变时不再重复试算）；None=不缓存
+max_plot_points = None  # 每条曲线最多绘制点数（LTTB 抽稀，峰值点总保留）；None=图宽像素数（12英寸×300dpi），0=不抽稀
 
 # 第一行初始值
 initial_avg_inflow = 0.0  # 时段平均入库流量第一行数值
@@ -49,109 +44,27 @@ decimal_places = 1  # 试算取值小数位数
 
 
 # ================================
-# 数据读取和预处理
+# 演算（调用 调洪计算-试算法.py）
 # ================================
 
-def read_data():
-    """读取所有输入数据"""
-    try:
-        # 读取入库洪水过程线
-        flood_data = pd.read_csv(flood_process_file, encoding=flood_encoding)
-        print(f"成功读取入库洪水过程线数据，共{len(flood_data)}行")
-
-        # 读取水位-库容曲线
-        storage_curve = pd.read_csv(storage_curve_file, encoding=storage_curve_encoding)
-        print(f"成功读取水位-库容曲线数据，共{len(storage_curve)}行")
-
-        # 读取水位-下泄流量曲线
-        discharge_curve = pd.read_csv(discharge_curve_file, encoding=discharge_curve_encoding)
-        print(f"成功读取水位-下泄流量曲线数据，共{len(discharge_curve)}行")
-
-        return flood_data, storage_curve, discharge_curve
-    except Exception as e:
-        print(f"读取数据时出错: {e}")
-        return None, None, None
-
-
-def create_interpolation_functions(storage_curve, discharge_curve):
-    """创建插值函数"""
-    # 水位-库容插值函数
-    Z_storage = storage_curve['水位Z/m'].values
-    V_storage = storage_curve['库容V/万m3'].values
-    storage_interp = interp1d(Z_storage, V_storage, kind='linear',
-                              bounds_error=False, fill_value="extrapolate")
-
-    # 水位-下泄流量插值函数
-    Z_discharge = discharge_curve['水位Z/m'].values
-    q_discharge = discharge_curve['下泄流量q/(m3·s)'].values
-    discharge_interp = interp1d(Z_discharge, q_discharge, kind='linear',
-                                bounds_error=False, fill_value="extrapolate")
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-    # 库容-水位反插值函数（用于第六步检验）
-    V_Z_interp = interp1d(V_storage, Z_storage, kind='linear',
-                          bounds_error=False, fill_value="extrapolate")
 
-    return storage_interp, discharge_interp, V_Z_interp
-
-
-# ================================
-# 试算过程函数
-# ================================
-
-def trial_calculation(row_idx, prev_row, storage_interp, discharge_interp, V_Z_interp,
-                      current_avg_inflow, time_diff):
+def load_trial_script():
     """
-    进行试算过程
+    加载同目录下的 调洪计算-试算法.py（文件名含中文与连字符，不能直接 import），
+    并用本脚本的输入文件、初始值与试算参数覆盖其参数；演算、参数验证与结果缓存均由该脚本完成
     """
-    best_Z = None
-    best_q = None
-    best_avg_q = None
-    best_delta_V = None
-    best_V = None
-    min_error = float('inf')
-
-    # 第一步：在试算区间内遍历所有可能的水位值
-    step = 10 ** (-decimal_places)
-    Z_candidates = np.arange(Z_search_min, Z_search_max + step, step)
-    Z_candidates = np.round(Z_candidates, decimal_places)
-
-    for Z_candidate in tqdm(Z_candidates, desc=f"第{row_idx + 1}行试算", leave=False):
-        # 第二步：通过水位插值得到库容和下泄流量
-        try:
-            V_candidate = float(storage_interp(Z_candidate))
-            q_candidate = float(discharge_interp(Z_candidate))
-        except:
-            continue
-
-        # 第三步：计算时段平均下泄流量
-        avg_q_candidate = (prev_row['下泄流量q/(m³·s⁻¹)'] + q_candidate) / 2
-
-        # 第四步：计算时段内水库存水量变化
-        delta_V_candidate = (current_avg_inflow - avg_q_candidate) * time_diff * 3600 * unit_conversion
-
-        # 第五步：计算当前水库存水量
-        V_current = prev_row['水库存水量V/万m³'] + delta_V_candidate
-
-        # 检验水库存水量（绝对误差）
-        if abs(V_current - V_candidate) <= V_tolerance:
-            # 第六步：用计算得到的水库存水量反推水位进行检验
-            try:
-                Z_check = float(V_Z_interp(V_current))
-                # 检验水位是否在合理范围内
-                if Z_search_min <= Z_check <= Z_search_max:
-                    # 记录误差最小的解
-                    current_error = abs(V_current - V_candidate)
-                    if current_error < min_error:
-                        min_error = current_error
-                        best_Z = Z_candidate
-                        best_q = q_candidate
-                        best_avg_q = avg_q_candidate
-                        best_delta_V = delta_V_candidate
-                        best_V = V_current
-            except:
-                continue
-
-    return best_Z, best_q, best_avg_q, best_delta_V, best_V, min_error
+    spec = importlib.util.spec_from_file_location('调洪计算-试算法', os.path.join(SCRIPT_DIR, '调洪计算-试算法.py'))
+    trial = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(trial)
+    for name in ('flood_process_file', 'storage_curve_file', 'discharge_curve_file',
+                 'flood_encoding', 'storage_curve_encoding', 'discharge_curve_encoding',
+                 'initial_avg_inflow', 'initial_discharge', 'initial_avg_discharge', 'initial_delta_V',
+                 'initial_V', 'initial_Z', 'time_interval', 'unit_conversion',
+                 'V_tolerance', 'Z_search_min', 'Z_search_max', 'decimal_places', 'cache_dir'):
+        setattr(trial, name, globals()[name])
+    return trial
 
 
 # ================================
@@ -159,195 +72,26 @@ def trial_calculation(row_idx, prev_row, storage_interp, discharge_interp, V_Z_i
 # ================================
 
 def create_visualization(flood_data, results):
-    """创建调洪演算结果可视化"""
+    """创建调洪演算结果可视化（上下布局流量 / 水位过程线，版式与 RK4 可视化、批量绘图脚本相同）"""
     print("正在生成可视化图表...")
-
-    # 创建图形和子图
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-
-    # 设置时间间隔
-    time_vals = flood_data['时间t/h']
-
-    # 第一个子图：时间-流量曲线
-    # 入库流量
-    inflow_max_idx = flood_data['Q/(m3/s-1)'].idxmax()
-    inflow_max_time = time_vals[inflow_max_idx]
-    inflow_max_value = flood_data['Q/(m3/s-1)'].max()
-
-    # 下泄流量
-    discharge_max_idx = results['下泄流量q/(m³·s⁻¹)'].idxmax()
-    discharge_max_time = time_vals[discharge_max_idx]
-    discharge_max_value = results['下泄流量q/(m³·s⁻¹)'].max()
-
-    # 绘制流量曲线
-    ax1.plot(time_vals, flood_data['Q/(m3/s-1)'], 'b-', linewidth=2, label='入库流量')
-    ax1.plot(time_vals, results['下泄流量q/(m³·s⁻¹)'], 'r-', linewidth=2, label='下泄流量')
-
-    # 标记最大值点
-    ax1.plot(inflow_max_time, inflow_max_value, 'bo', markersize=8, label=f'最大入库流量: {inflow_max_value:.1f} m³/s')
-    ax1.plot(discharge_max_time, discharge_max_value, 'ro', markersize=8,
-             label=f'最大下泄流量: {discharge_max_value:.1f} m³/s')
-
-    # 设置第一个子图属性
-    ax1.set_xlabel('时间 (h)')
-    ax1.set_ylabel('流量 (m³/s)')
-    ax1.set_title('时间-流量过程线')
-    ax1.grid(True, linestyle='--', alpha=0.7)
-    ax1.legend(loc='best')
-
-    # 设置x轴间隔
-    time_min, time_max = time_vals.min(), time_vals.max()
-    time_interval_vis = max(1, (time_max - time_min) // 10)  # 自动计算合适的间隔
-    ax1.set_xticks(np.arange(time_min, time_max + time_interval_vis, time_interval_vis))
-
-    # 设置y轴间隔
-    flow_max = max(inflow_max_value, discharge_max_value)
-    flow_interval = max(50, flow_max // 10)  # 自动计算合适的间隔
-    ax1.set_yticks(np.arange(0, flow_max + flow_interval, flow_interval))
-
-    # 第二个子图：时间-水位曲线
-    # 水库水位
-    water_level_max_idx = results['水库水位Z/m'].idxmax()
-    water_level_max_time = time_vals[water_level_max_idx]
-    water_level_max_value = results['水库水位Z/m'].max()
-
-    # 绘制水位曲线
-    ax2.plot(time_vals, results['水库水位Z/m'], 'g-', linewidth=2, label='水库水位')
-
-    # 标记最大值点
-    ax2.plot(water_level_max_time, water_level_max_value, 'go', markersize=8,
-             label=f'最高水位: {water_level_max_value:.2f} m')
-
-    # 设置第二个子图属性
-    ax2.set_xlabel('时间 (h)')
-    ax2.set_ylabel('水位 (m)')
-    ax2.set_title('时间-水位过程线')
-    ax2.grid(True, linestyle='--', alpha=0.7)
-    ax2.legend(loc='best')
-
-    # 设置x轴间隔（与第一个子图一致）
-    ax2.set_xticks(np.arange(time_min, time_max + time_interval_vis, time_interval_vis))
-
-    # 设置y轴间隔
-    level_min, level_max = results['水库水位Z/m'].min(), results['水库水位Z/m'].max()
-    level_interval = max(0.5, (level_max - level_min) / 10)  # 自动计算合适的间隔
-    ax2.set_yticks(np.arange(level_min, level_max + level_interval, level_interval))
-
-    # 调整布局
-    plt.tight_layout()
-
-    # 保存图像
-    plt.savefig(visualization_output, dpi=300, bbox_inches='tight')
+    # matplotlib 与中文字体到绘图时才加载、设置（缓存命中、只演算时不付出这部分启动开销）
+    plotting.plot_hydrograph(flood_data['时间t/h'].values, flood_data['Q/(m3/s-1)'].values,
+                             results['下泄流量q/(m³·s⁻¹)'].values, results['水库水位Z/m'].values,
+                             '试算法', visualization_output, show_figure, (12, 10), 300, max_plot_points)
     print(f"可视化图表已保存到: {visualization_output}")
 
-    # 显示图像
-    plt.show()
-
-    return fig
-
 
 # ================================
 # 主计算函数
 # ================================
 
-def calculate_flood_routing():
+def calculate_flood_routing(trial):
     """主计算函数"""
-    # 读取数据
-    flood_data, storage_curve, discharge_curve = read_data()
-    if flood_data is None:
+    # 输入文件与演算参数未变时由试算法脚本直接读取缓存结果，只重新绘图
+    routed = trial.routing_results()
+    if routed is None:
         return False
-
-    # 创建插值函数
-    storage_interp, discharge_interp, V_Z_interp = create_interpolation_functions(
-        storage_curve, discharge_curve)
-
-    # 初始化结果DataFrame
-    results = pd.DataFrame({
-        '时间t/h': flood_data['时间t/h'],
-        '入库流量Q/(m³·s⁻¹)': flood_data['Q/(m3/s-1)'],
-        '时段平均入库流量/(m³·s⁻¹)': [0.0] * len(flood_data),
-        '下泄流量q/(m³·s⁻¹)': [0.0] * len(flood_data),
-        '时段平均下泄流量/(m³·s⁻¹)': [0.0] * len(flood_data),
-        '时段内水库存水量变化ΔV/万m³': [0.0] * len(flood_data),
-        '水库存水量V/万m³': [0.0] * len(flood_data),
-        '水库水位Z/m': [0.0] * len(flood_data)
-    })
-
-    # 设置第一行数值
-    results.loc[0, '时段平均入库流量/(m³·s⁻¹)'] = initial_avg_inflow
-    results.loc[0, '下泄流量q/(m³·s⁻¹)'] = initial_discharge
-    results.loc[0, '时段平均下泄流量/(m³·s⁻¹)'] = initial_avg_discharge
-    results.loc[0, '时段内水库存水量变化ΔV/万m³'] = initial_delta_V
-    results.loc[0, '水库存水量V/万m³'] = initial_V
-    results.loc[0, '水库水位Z/m'] = initial_Z
-
-    # 从第二行开始计算
-    print("开始进行调洪演算计算...")
-    success_count = 0
-
-    for i in tqdm(range(1, len(flood_data)), desc="总体进度"):
-        # 计算时段平均入库流量
-        if i == 1:
-            # 第二行：第一行与第二行入库流量的平均值
-            results.loc[i, '时段平均入库流量/(m³·s⁻¹)'] = (
-                                                                  results.loc[i - 1, '入库流量Q/(m³·s⁻¹)'] +
-                                                                  results.loc[i, '入库流量Q/(m³·s⁻¹)']
-                                                          ) / 2
-        else:
-            # 第n行(n>=2)：第n-1行与第n行入库流量的平均值
-            results.loc[i, '时段平均入库流量/(m³·s⁻¹)'] = (
-                                                                  results.loc[i - 1, '入库流量Q/(m³·s⁻¹)'] +
-                                                                  results.loc[i, '入库流量Q/(m³·s⁻¹)']
-                                                          ) / 2
-
-        # 获取前一行数据
-        prev_row = results.iloc[i - 1]
-        current_avg_inflow = results.loc[i, '时段平均入库流量/(m³·s⁻¹)']
-        time_diff = results.loc[i, '时间t/h'] - results.loc[i - 1, '时间t/h']
-
-        # 进行试算
-        best_Z, best_q, best_avg_q, best_delta_V, best_V, min_error = trial_calculation(
-            i, prev_row, storage_interp, discharge_interp, V_Z_interp,
-            current_avg_inflow, time_diff
-        )
-
-        if best_Z is not None:
-            results.loc[i, '下泄流量q/(m³·s⁻¹)'] = best_q
-            results.loc[i, '时段平均下泄流量/(m³·s⁻¹)'] = best_avg_q
-            results.loc[i, '时段内水库存水量变化ΔV/万m³'] = best_delta_V
-            results.loc[i, '水库存水量V/万m³'] = best_V
-            results.loc[i, '水库水位Z/m'] = best_Z
-            success_count += 1
-        else:
-            print(f"\n警告：第{i + 1}行无法找到合适的解，使用近似值")
-            # 如果找不到合适解，使用近似方法
-            # 使用前一行值作为初始估计
-            prev_Z = prev_row['水库水位Z/m']
-            prev_q = prev_row['下泄流量q/(m³·s⁻¹)']
-
-            # 计算近似的下泄流量和库容
-            try:
-                approx_q = float(discharge_interp(prev_Z))
-                approx_V = float(storage_interp(prev_Z))
-            except:
-                approx_q = prev_q
-                approx_V = prev_row['水库存水量V/万m³']
-
-            # 计算其他值
-            results.loc[i, '下泄流量q/(m³·s⁻¹)'] = approx_q
-            results.loc[i, '时段平均下泄流量/(m³·s⁻¹)'] = (prev_q + approx_q) / 2
-            results.loc[i, '时段内水库存水量变化ΔV/万m³'] = (
-                                                                    current_avg_inflow - results.loc[
-                                                                i, '时段平均下泄流量/(m³·s⁻¹)']
-                                                            ) * time_diff * 3600 * unit_conversion
-            results.loc[i, '水库存水量V/万m³'] = prev_row['水库存水量V/万m³'] + results.loc[
-                i, '时段内水库存水量变化ΔV/万m³']
-
-            # 通过库容反推水位
-            try:
-                results.loc[i, '水库水位Z/m'] = float(V_Z_interp(results.loc[i, '水库存水量V/万m³']))
-            except:
-                results.loc[i, '水库水位Z/m'] = prev_Z
+    flood_data, results, success_count = routed
 
     # 保存结果
     try:
@@ -372,41 +116,6 @@ def calculate_flood_routing():
         return False
 
 
-# ================================
-# 参数验证函数
-# ================================
-
-def validate_parameters():
-    """验证输入参数"""
-    errors = []
-
-    # 检查文件是否存在
-    if not os.path.exists(flood_process_file):
-        errors.append(f"入库洪水过程线文件不存在: {flood_process_file}")
-    if not os.path.exists(storage_curve_file):
-        errors.append(f"水位-库容曲线文件不存在: {storage_curve_file}")
-    if not os.path.exists(discharge_curve_file):
-        errors.append(f"水位-下泄流量曲线文件不存在: {discharge_curve_file}")
-
-    # 检查参数范围
-    if Z_search_min >= Z_search_max:
-        errors.append("试算水位最小值必须小于最大值")
-
-    if time_interval <= 0:
-        errors.append("时间隔值必须大于0")
-
-    if unit_conversion <= 0:
-        errors.append("单位换算值必须大于0")
-
-    if V_tolerance <= 0:
-        errors.append("水库存水量误差必须大于0")
-
-    if decimal_places < 0 or decimal_places > 6:
-        errors.append("试算小数位数应在0-6之间")
-
-    return errors
-
-
 # ================================
 # 主程序
 # ================================
@@ -416,7 +125,8 @@ if __name__ == "__main__":
     print("=" * 50)
 
     # 验证参数
-    validation_errors = validate_parameters()
+    trial = load_trial_script()
+    validation_errors = trial.validate_parameters()
     if validation_errors:
         print("参数验证错误:")
         for error in validation_errors:
@@ -424,7 +134,7 @@ if __name__ == "__main__":
         print("请修改参数后重新运行程序。")
     else:
         print("参数验证通过")
-        success = calculate_flood_routing()
+        success = calculate_flood_routing(trial)
 
         if success:
             print("程序运行成功！")
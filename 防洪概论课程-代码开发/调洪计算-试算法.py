@@ -1,8 +1,12 @@
 import pandas as pd
 import numpy as np
 from scipy.interpolate import interp1d
+from scipy.optimize import brentq
 from tqdm import tqdm
 import os
+import json
+import time
+import floodroute as fr
 
 # ================================
 # 用户参数设置区域
@@ -30,11 +34,30 @@ initial_Z = 38.0  # 水库水位第一行数值（示例值，请根据实际情
 time_interval = 3600 * 1  # 固定的时间隔值（小时） 第一列差值*秒*单位换算 与入库流量过程线的 时间间隔相同（插值间隔）
 unit_conversion = 0.0001  # 单位换算值 (m³到万m³的转换，1万m³=10000m³，所以是1/10000=0.0001)
 
+# 时段整理（各时段长按相邻时间之差计算，可不等间隔）
+merge_interval_h = 0  # 短于该值（小时）的时段与后续时段合并（洪峰时刻保留，合并前后水量不变）；0=不合并
+split_interval_h = 0  # 长于该值（小时）的时段等分加密，加密时刻入库流量线性插值；0=不加密
+
 # 试算参数
 V_tolerance = 3  # 水库存水量V绝对误差（万m³）
 Z_search_min = 36.0  # 试算水位最小值
 Z_search_max = 41.0  # 试算水位最大值
 decimal_places = 1  # 试算取值小数位数
+search_method = 'grid'  # 试算方式：'grid' 按小数位数逐点遍历（原方法）；'vector' 同 grid 的整体数组计算（结果逐位一致）；'brent' 区间求根（Brent法）
+root_xtol = 1e-6  # 区间求根的水位收敛精度（m），仅 'brent' 有效
+root_maxiter = 100  # 区间求根最大迭代次数，仅 'brent' 有效
+
+# 长系列连续演算参数
+simulation_mode = 'standard'  # 'standard' 逐格写入DataFrame（原方法）；'continuous' 数组存储状态，适合多年逐时长系列（'grid' 自动改用 'vector'）
+csv_chunk_rows = 100000  # 连续演算模式下分块写出CSV的行数
+checkpoint_every = 0  # 每隔多少时段追加写出结果并保存检查点（标准、连续演算模式均可）；0=不保存，计算结束后一次写出
+checkpoint_file = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\A1_试算法_检查点.json"  # 检查点文件；存在且输入未变时从检查点续算
+
+# 求解记录
+telemetry_file = None  # 逐时段求解记录文件（JSON lines：求值次数、迭代次数、残差、是否近似、耗时）；None=不记录
+
+# 结果缓存
+cache_dir = None  # 标准演算模式的结果缓存目录（与 调洪计算-试算法-可视化.py 共用，输入文件与参数未变时不再重复试算）；None=不缓存
 
 
 # ================================
@@ -47,6 +70,7 @@ def read_data():
         # 读取入库洪水过程线
         flood_data = pd.read_csv(flood_process_file,encoding=flood_encoding)
         print(f"成功读取入库洪水过程线数据，共{len(flood_data)}行")
+        flood_data = regularize_time_steps(flood_data)
 
         # 读取水位-库容曲线
         storage_curve = pd.read_csv(storage_curve_file,encoding=storage_curve_encoding)
@@ -62,6 +86,23 @@ def read_data():
         return None, None, None
 
 
+def regularize_time_steps(flood_data):
+    """
+    整理不等间隔入库洪水过程线（floodroute.regularize_time_steps）：剔除缺测（空值）行，检查时间严格递增，
+    按 merge_interval_h 合并过短时段（洪峰时刻保留、水量不变），按 split_interval_h 等分过长时段
+    """
+    t_raw = flood_data['时间t/h'].values.astype(float)
+    Q_raw = flood_data['Q/(m3/s-1)'].values.astype(float)
+    t, Q = fr.regularize_time_steps(t_raw, Q_raw, merge_interval_h, split_interval_h)
+
+    # 剔除、合并、加密任一项改变了过程线时返回重建的表（缺测值 NaN 与自身不相等，按已改变处理）
+    if np.array_equal(t, t_raw) and np.array_equal(Q, Q_raw):
+        return flood_data
+    if len(t) != len(t_raw):
+        print(f"时段整理：{len(t_raw)} 个时刻 → {len(t)} 个时刻")
+    return pd.DataFrame({'时间t/h': t, 'Q/(m3/s-1)': Q})
+
+
 def create_interpolation_functions(storage_curve, discharge_curve):
     """创建插值函数"""
     # 水位-库容插值函数
@@ -88,9 +129,10 @@ def create_interpolation_functions(storage_curve, discharge_curve):
 # ================================
 
 def trial_calculation(row_idx, prev_row, storage_interp, discharge_interp, V_Z_interp,
-                      current_avg_inflow, time_diff):
+                      current_avg_inflow, time_diff, stats=None):
     """
     进行试算过程
+    stats 不为 None 时记录求值次数与最小水量平衡残差（不论是否满足容差）
     """
     best_Z = None
     best_q = None
@@ -98,6 +140,8 @@ def trial_calculation(row_idx, prev_row, storage_interp, discharge_interp, V_Z_i
     best_delta_V = None
     best_V = None
     min_error = float('inf')
+    evaluations = 0
+    min_residual = float('inf')
 
     # 第一步：在试算区间内遍历所有可能的水位值
     step = 10 ** (-decimal_places)
@@ -111,6 +155,7 @@ def trial_calculation(row_idx, prev_row, storage_interp, discharge_interp, V_Z_i
             q_candidate = float(discharge_interp(Z_candidate))
         except:
             continue
+        evaluations += 1
 
         # 第三步：计算时段平均下泄流量
         avg_q_candidate = (prev_row['下泄流量q/(m³·s⁻¹)'] + q_candidate) / 2
@@ -120,6 +165,7 @@ def trial_calculation(row_idx, prev_row, storage_interp, discharge_interp, V_Z_i
 
         # 第五步：计算当前水库存水量
         V_current = prev_row['水库存水量V/万m³'] + delta_V_candidate
+        min_residual = min(min_residual, abs(V_current - V_candidate))
 
         # 检验水库存水量（绝对误差）
         if abs(V_current - V_candidate) <= V_tolerance:
@@ -140,20 +186,159 @@ def trial_calculation(row_idx, prev_row, storage_interp, discharge_interp, V_Z_i
             except:
                 continue
 
+    if stats is not None:
+        stats.update(evaluations=evaluations, iterations=len(Z_candidates), residual=min_residual)
     return best_Z, best_q, best_avg_q, best_delta_V, best_V, min_error
 
 
+def trial_calculation_vector(row_idx, prev_row, storage_interp, discharge_interp, V_Z_interp,
+                             current_avg_inflow, time_diff, stats=None):
+    """
+    向量化试算
+    与 trial_calculation 使用相同的候选水位和运算顺序，一次性对全部候选水位插值、
+    计算水量平衡误差并做掩码筛选，结果（含误差相同时取较低水位、Z_check 范围检验）与逐点遍历逐位一致；
+    整体插值出错时本行改由 trial_calculation 逐点试算，出错的候选水位被跳过，不中断演算
+    """
+    # 第一步：试算区间内所有可能的水位值
+    step = 10 ** (-decimal_places)
+    Z_candidates = np.arange(Z_search_min, Z_search_max + step, step)
+    Z_candidates = np.round(Z_candidates, decimal_places)
+
+    # 第二步至第五步：整体插值与水量平衡计算
+    try:
+        V_candidates = storage_interp(Z_candidates)
+        q_candidates = discharge_interp(Z_candidates)
+        avg_q_candidates = (prev_row['下泄流量q/(m³·s⁻¹)'] + q_candidates) / 2
+        delta_V_candidates = (current_avg_inflow - avg_q_candidates) * time_diff * 3600 * unit_conversion
+        V_current = prev_row['水库存水量V/万m³'] + delta_V_candidates
+        Z_check = V_Z_interp(V_current)
+    except Exception:
+        return trial_calculation(row_idx, prev_row, storage_interp, discharge_interp, V_Z_interp,
+                                 current_avg_inflow, time_diff, stats)
+
+    # 检验水库存水量（绝对误差）及反推水位范围
+    errors = np.abs(V_current - V_candidates)
+    if stats is not None:
+        stats.update(evaluations=len(Z_candidates), iterations=1, residual=float(errors.min()))
+    valid = errors <= V_tolerance
+    valid &= (Z_search_min <= Z_check) & (Z_check <= Z_search_max)
+    if not valid.any():
+        return None, None, None, None, None, float('inf')
+
+    # 误差最小的解；argmin 取首个最小值，与逐点遍历的严格小于比较一致
+    idx = int(np.argmin(np.where(valid, errors, np.inf)))
+    return (Z_candidates[idx], float(q_candidates[idx]), avg_q_candidates[idx],
+            delta_V_candidates[idx], V_current[idx], errors[idx])
+
+
+def trial_calculation_root(row_idx, prev_row, storage_interp, discharge_interp, V_Z_interp,
+                           current_avg_inflow, time_diff, stats=None):
+    """
+    区间求根试算（Brent法）
+    水量平衡残差 f(Z) = V_current(Z) - V(Z) 随水位单调递减，
+    在[Z_search_min, Z_search_max]内直接求根，每时段仅需数十次插值，
+    计算量与试算小数位数无关；结果仍按 V_tolerance 和 Z_check 检验，返回值同 trial_calculation
+    """
+    prev_q = prev_row['下泄流量q/(m³·s⁻¹)']
+    prev_V = prev_row['水库存水量V/万m³']
+    evaluations = 0
+
+    def water_balance(Z):
+        nonlocal evaluations
+        evaluations += 1
+        # 第二步至第五步：下泄流量、时段平均下泄流量、存水量变化、当前存水量
+        q = float(discharge_interp(Z))
+        avg_q = (prev_q + q) / 2
+        delta_V = (current_avg_inflow - avg_q) * time_diff * 3600 * unit_conversion
+        V_current = prev_V + delta_V
+        return q, avg_q, delta_V, V_current, V_current - float(storage_interp(Z))
+
+    def residual(Z):
+        return water_balance(Z)[-1]
+
+    f_min = residual(Z_search_min)
+    f_max = residual(Z_search_max)
+    iterations = 0
+    if f_min * f_max <= 0:
+        Z_root, info = brentq(residual, Z_search_min, Z_search_max, xtol=root_xtol, maxiter=root_maxiter,
+                              full_output=True)
+        iterations = info.iterations
+    else:
+        # 试算区间内无根：取残差较小的端点，是否采用由容差检验决定
+        Z_root = Z_search_min if abs(f_min) <= abs(f_max) else Z_search_max
+
+    q, avg_q, delta_V, V_current, res = water_balance(Z_root)
+    error = abs(res)
+    if stats is not None:
+        stats.update(evaluations=evaluations, iterations=iterations, residual=error)
+
+    # 检验水库存水量（绝对误差）
+    if error > V_tolerance:
+        return None, None, None, None, None, float('inf')
+
+    # 第六步：用计算得到的水库存水量反推水位进行检验
+    Z_check = float(V_Z_interp(V_current))
+    if not Z_search_min <= Z_check <= Z_search_max:
+        return None, None, None, None, None, float('inf')
+
+    return Z_root, q, avg_q, delta_V, V_current, error
+
+
+# 试算方式 -> 试算函数
+TRIAL_METHODS = {
+    'grid': trial_calculation,
+    'vector': trial_calculation_vector,
+    'brent': trial_calculation_root,
+}
+
+
 # ================================
-# 主计算函数
+# 求解记录
 # ================================
 
-def calculate_flood_routing():
-    """主计算函数"""
-    # 读取数据
-    flood_data, storage_curve, discharge_curve = read_data()
-    if flood_data is None:
-        return False
+def new_telemetry(n):
+    """预分配 n 行的逐时段求解记录数组"""
+    return {
+        'evaluations': np.zeros(n, dtype=np.int64),   # 水量平衡求值次数（每次含库容、泄量插值各一次）
+        'iterations': np.zeros(n, dtype=np.int64),    # 遍历候选数 / 求根迭代次数
+        'residual': np.full(n, np.nan),               # 最终（或最小）水量平衡残差，万m³
+        'fallback': np.zeros(n, dtype=bool),          # 是否使用近似值
+        'wall_time': np.zeros(n),                     # 耗时，s
+    }
+
+
+def record_telemetry(telemetry, i, stats, fallback, wall_time):
+    """写入第 i 行的求解记录"""
+    telemetry['evaluations'][i] = stats.get('evaluations', 0)
+    telemetry['iterations'][i] = stats.get('iterations', 0)
+    telemetry['residual'][i] = stats.get('residual', np.nan)
+    telemetry['fallback'][i] = fallback
+    telemetry['wall_time'][i] = wall_time
+
+
+def save_telemetry(telemetry, t, lo, hi):
+    """把第 lo 至 hi-1 行（本次运行计算的各行）的求解记录写为 JSON lines，并打印汇总"""
+    records = pd.DataFrame({'row': np.arange(lo, hi) + 1, 'time_h': t[lo:hi]})
+    for name, values in telemetry.items():
+        records[name] = values[lo:hi]
+    records.to_json(telemetry_file, orient='records', lines=True, force_ascii=False)
+
+    print(f"\n求解记录已保存到: {telemetry_file}")
+    print(f"总耗时: {records['wall_time'].sum():.2f} s，总求值次数: {records['evaluations'].sum()}，"
+          f"使用近似值: {records['fallback'].sum()} 行")
+    slowest = records.nlargest(5, 'wall_time')
+    print("耗时最多的时段:")
+    for _, r in slowest.iterrows():
+        print(f"  第{r['row']}行（t={r['time_h']} h）: {r['wall_time'] * 1000:.2f} ms，"
+              f"求值 {r['evaluations']} 次，残差 {r['residual']:.4g}")
+
+
+# ================================
+# 主计算函数
+# ================================
 
+def route_flood(flood_data, storage_curve, discharge_curve):
+    """逐时段试算演算，返回结果DataFrame与成功试算的时段数"""
     # 创建插值函数
     storage_interp, discharge_interp, V_Z_interp = create_interpolation_functions(
         storage_curve, discharge_curve)
@@ -178,11 +363,28 @@ def calculate_flood_routing():
     results.loc[0, '水库存水量V/万m³'] = initial_V
     results.loc[0, '水库水位Z/m'] = initial_Z
 
-    # 从第二行开始计算
-    print("开始进行调洪演算计算...")
+    # 从检查点续算：已写出的各行从输出文件读回
+    start = written = 0
     success_count = 0
+    if checkpoint_every > 0:
+        key = run_hash()
+        state = load_checkpoint(key)
+        if state is not None:
+            done = pd.read_csv(output_file, encoding='utf-8-sig', float_precision='round_trip')
+            results.iloc[:len(done)] = done.values
+            start = written = state['step'] + 1
+            success_count = state['success_count']
+            print(f"从检查点续算：已完成{written}行，从第{written + 1}行开始")
 
-    for i in tqdm(range(1, len(flood_data)), desc="总体进度"):
+    # 从第二行开始计算
+    print(f"开始进行调洪演算计算（试算方式：{search_method}）...")
+    trial_func = TRIAL_METHODS[search_method]
+    telemetry = new_telemetry(len(flood_data)) if telemetry_file else None
+    stats = {} if telemetry is not None else None
+
+    for i in tqdm(range(max(start, 1), len(flood_data)), desc="总体进度",
+                  initial=max(start - 1, 0), total=len(flood_data) - 1):
+        step_start = time.perf_counter()
         # 计算时段平均入库流量
         if i == 1:
             # 第二行：第一行与第二行入库流量的平均值
@@ -203,9 +405,9 @@ def calculate_flood_routing():
         time_diff = results.loc[i, '时间t/h'] - results.loc[i - 1, '时间t/h']
 
         # 进行试算
-        best_Z, best_q, best_avg_q, best_delta_V, best_V, min_error = trial_calculation(
+        best_Z, best_q, best_avg_q, best_delta_V, best_V, min_error = trial_func(
             i, prev_row, storage_interp, discharge_interp, V_Z_interp,
-            current_avg_inflow, time_diff
+            current_avg_inflow, time_diff, stats=stats
         )
 
         if best_Z is not None:
@@ -246,9 +448,68 @@ def calculate_flood_routing():
             except:
                 results.loc[i, '水库水位Z/m'] = prev_Z
 
+        if telemetry is not None:
+            record_telemetry(telemetry, i, stats, best_Z is None, time.perf_counter() - step_start)
+
+        # 追加写出已完成的各行并保存检查点（续算时状态从输出文件读回）
+        if checkpoint_every > 0 and i % checkpoint_every == 0:
+            results.iloc[written:i + 1].to_csv(output_file, index=False, encoding='utf-8-sig',
+                                               mode='w' if written == 0 else 'a', header=written == 0)
+            written = i + 1
+            save_checkpoint({'hash': key, 'step': i, 'output_bytes': os.path.getsize(output_file),
+                             'success_count': success_count})
+
+    if telemetry is not None:
+        save_telemetry(telemetry, results['时间t/h'].values, max(start, 1), len(flood_data))
+
+    return results, success_count
+
+
+def load_cache(key):
+    """读取缓存的结果DataFrame与成功试算时段数；没有缓存时返回 None"""
+    data = fr.load_cache(cache_dir, 'trial', key)
+    if data is None:
+        return None
+    results = pd.DataFrame(data['values'], columns=[str(c) for c in data['columns']])
+    return results, int(data['success_count'])
+
+
+def save_cache(key, results, success_count):
+    fr.save_cache(cache_dir, 'trial', key, columns=np.array(results.columns, dtype=str),
+                  values=results.values.astype(float), success_count=success_count)
+
+
+def routing_results():
+    """
+    读取数据并演算，返回入库过程、结果DataFrame与成功试算的时段数；读取数据失败时返回 None
+    cache_dir 中有相同输入文件与参数（run_hash）的结果时直接读取，不再重复试算
+    """
+    flood_data, storage_curve, discharge_curve = read_data()
+    if flood_data is None:
+        return None
+
+    key = run_hash() if cache_dir else None
+    cached = load_cache(key)
+    if cached is not None:
+        print(f"读取缓存的演算结果: {fr.cache_path(cache_dir, 'trial', key)}")
+        return (flood_data,) + cached
+    results, success_count = route_flood(flood_data, storage_curve, discharge_curve)
+    save_cache(key, results, success_count)
+    return flood_data, results, success_count
+
+
+def calculate_flood_routing():
+    """主计算函数"""
+    routed = routing_results()
+    if routed is None:
+        return False
+    flood_data, results, success_count = routed
+
     # 保存结果
     try:
         results.to_csv(output_file, index=False, encoding='utf-8-sig')
+        if checkpoint_every > 0 and os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
         print(f"\n计算完成！")
         print(f"成功计算: {success_count}/{len(flood_data) - 1} 行")
         print(f"结果已保存到: {output_file}")
@@ -266,6 +527,228 @@ def calculate_flood_routing():
         return False
 
 
+# ================================
+# 检查点（连续演算续算）
+# ================================
+
+def run_hash():
+    """输入文件内容与全部演算参数（含第一行各初始值、文件编码、演算模式）的哈希；任一变化时检查点与结果缓存作废"""
+    params = [flood_encoding, storage_curve_encoding, discharge_curve_encoding,
+              initial_avg_inflow, initial_discharge, initial_avg_discharge, initial_delta_V, initial_V, initial_Z,
+              time_interval, unit_conversion, merge_interval_h, split_interval_h,
+              V_tolerance, Z_search_min, Z_search_max, decimal_places, search_method, root_xtol, root_maxiter,
+              simulation_mode]
+    return fr.run_hash((flood_process_file, storage_curve_file, discharge_curve_file), params)
+
+
+def save_checkpoint(state):
+    """先写临时文件再替换，保证中断时检查点文件完整"""
+    tmp_file = checkpoint_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_file, checkpoint_file)
+
+
+def load_checkpoint(key):
+    """
+    读取与当前输入一致的检查点，并把输出文件截断到检查点记录的长度
+    （检查点之后追加的不完整结果会被丢弃）；没有可用检查点时返回 None
+    """
+    if not os.path.exists(checkpoint_file):
+        return None
+    with open(checkpoint_file, encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('hash') != key:
+        print("检查点与当前输入文件或参数不一致，重新开始计算")
+        return None
+    if not os.path.exists(output_file) or os.path.getsize(output_file) < state['output_bytes']:
+        print("输出文件缺失或不完整，重新开始计算")
+        return None
+    with open(output_file, 'r+b') as f:
+        f.truncate(state['output_bytes'])
+    return state
+
+
+def calculate_flood_routing_continuous():
+    """
+    长系列连续演算
+    状态量保存在预分配的NumPy数组中，逐时段只读写数组元素，
+    结果按行段组装DataFrame并分块写出CSV；计算公式与 calculate_flood_routing 相同。
+    checkpoint_every > 0 时每隔该时段数把新结果追加写入输出文件并保存检查点
+    （时段序号、V、Z、q 与输入哈希），中断后再次运行从最后一个检查点续算。
+    多年逐时序列要在秒级完成只能用 'vector'（每时段一次数组运算）：'brent' 每时段数十次标量插值，
+    约慢 2~3 倍；'grid' 逐点遍历慢一个数量级以上。因 'vector' 与 'grid' 结果逐位一致，
+    本模式下 search_method='grid' 自动改用 'vector'
+    """
+    # 读取数据
+    flood_data, storage_curve, discharge_curve = read_data()
+    if flood_data is None:
+        return False
+
+    # 创建插值函数
+    storage_interp, discharge_interp, V_Z_interp = create_interpolation_functions(
+        storage_curve, discharge_curve)
+
+    n = len(flood_data)
+    t = flood_data['时间t/h'].values
+    Q = flood_data['Q/(m3/s-1)'].values
+
+    # 预分配结果数组
+    avg_Q = np.zeros(n)
+    q = np.zeros(n)
+    avg_q = np.zeros(n)
+    delta_V = np.zeros(n)
+    V = np.zeros(n)
+    Z = np.zeros(n)
+
+    # 设置第一行数值
+    avg_Q[0] = initial_avg_inflow
+    q[0] = initial_discharge
+    avg_q[0] = initial_avg_discharge
+    delta_V[0] = initial_delta_V
+    V[0] = initial_V
+    Z[0] = initial_Z
+
+    # 时段平均入库流量与时段长度一次算出
+    avg_Q[1:] = (Q[:-1] + Q[1:]) / 2
+    time_diffs = np.diff(t)
+
+    # 从检查点续算
+    start = 0
+    written = 0
+    success_count = 0
+    fallback_count = 0
+    fallback_rows = []
+    q_max = q[0]
+    if checkpoint_every > 0:
+        key = run_hash()
+        state = load_checkpoint(key)
+        if state is not None:
+            start = written = state['step'] + 1
+            q[state['step']], V[state['step']], Z[state['step']] = state['q'], state['V'], state['Z']
+            success_count = state['success_count']
+            fallback_count = state['fallback_count']
+            fallback_rows = state['fallback_rows']
+            q_max = state['q_max']
+            print(f"从检查点续算：已完成{written}行，从第{written + 1}行开始")
+
+    def write_rows(lo, hi):
+        """把第 lo 至 hi-1 行结果写入输出文件（首段写表头，其余追加）"""
+        rows = pd.DataFrame({
+            '时间t/h': t[lo:hi],
+            '入库流量Q/(m³·s⁻¹)': Q[lo:hi],
+            '时段平均入库流量/(m³·s⁻¹)': avg_Q[lo:hi],
+            '下泄流量q/(m³·s⁻¹)': q[lo:hi],
+            '时段平均下泄流量/(m³·s⁻¹)': avg_q[lo:hi],
+            '时段内水库存水量变化ΔV/万m³': delta_V[lo:hi],
+            '水库存水量V/万m³': V[lo:hi],
+            '水库水位Z/m': Z[lo:hi]
+        })
+        rows.to_csv(output_file, index=False, encoding='utf-8-sig', chunksize=csv_chunk_rows,
+                    mode='w' if lo == 0 else 'a', header=lo == 0)
+
+    method = 'vector' if search_method == 'grid' else search_method
+    print(f"开始进行长系列连续演算（试算方式：{method}，共{n}行）...")
+    trial_func = TRIAL_METHODS[method]
+    telemetry = new_telemetry(n) if telemetry_file else None
+    stats = {} if telemetry is not None else None
+
+    for i in tqdm(range(max(start, 1), n), desc="总体进度", mininterval=1.0,
+                  initial=max(start - 1, 0), total=n - 1):
+        step_start = time.perf_counter()
+        prev_row = {
+            '下泄流量q/(m³·s⁻¹)': q[i - 1],
+            '水库存水量V/万m³': V[i - 1],
+            '水库水位Z/m': Z[i - 1],
+        }
+        current_avg_inflow = avg_Q[i]
+        time_diff = time_diffs[i - 1]
+
+        # 进行试算
+        best_Z, best_q, best_avg_q, best_delta_V, best_V, min_error = trial_func(
+            i, prev_row, storage_interp, discharge_interp, V_Z_interp,
+            current_avg_inflow, time_diff, stats=stats
+        )
+
+        if best_Z is not None:
+            q[i] = best_q
+            avg_q[i] = best_avg_q
+            delta_V[i] = best_delta_V
+            V[i] = best_V
+            Z[i] = best_Z
+            success_count += 1
+        else:
+            # 找不到合适解时的近似方法与 calculate_flood_routing 相同，仅汇总提示
+            fallback_count += 1
+            if len(fallback_rows) < 10:
+                fallback_rows.append(i + 1)
+            try:
+                approx_q = float(discharge_interp(Z[i - 1]))
+            except:
+                approx_q = q[i - 1]
+            q[i] = approx_q
+            avg_q[i] = (q[i - 1] + approx_q) / 2
+            delta_V[i] = (current_avg_inflow - avg_q[i]) * time_diff * 3600 * unit_conversion
+            V[i] = V[i - 1] + delta_V[i]
+
+            # 通过库容反推水位
+            try:
+                Z[i] = float(V_Z_interp(V[i]))
+            except:
+                Z[i] = Z[i - 1]
+
+        if telemetry is not None:
+            record_telemetry(telemetry, i, stats, best_Z is None, time.perf_counter() - step_start)
+
+        # 追加写出已完成的结果并保存检查点
+        if checkpoint_every > 0 and i % checkpoint_every == 0:
+            write_rows(written, i + 1)
+            q_max = max(q_max, float(q[written:i + 1].max()))
+            written = i + 1
+            save_checkpoint({
+                'hash': key, 'step': i, 'V': float(V[i]), 'Z': float(Z[i]), 'q': float(q[i]),
+                'output_bytes': os.path.getsize(output_file), 'success_count': success_count,
+                'fallback_count': fallback_count, 'fallback_rows': fallback_rows, 'q_max': q_max,
+            })
+
+    if fallback_count:
+        print(f"\n警告：共{fallback_count}行无法找到合适的解，已使用近似值，前几行为：{fallback_rows}")
+
+    if telemetry is not None:
+        save_telemetry(telemetry, t, max(start, 1), n)
+
+    # 写出剩余结果
+    try:
+        if written < n:
+            write_rows(written, n)
+            q_max = max(q_max, float(q[written:].max()))
+        if checkpoint_every > 0 and os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+
+        print(f"\n计算完成！")
+        print(f"成功计算: {success_count}/{n - 1} 行")
+        print(f"结果已保存到: {output_file}")
+        print(f"结果文件包含{n}行数据")
+
+        # 显示结果统计
+        print("\n结果统计:")
+        print(f"最终水位: {Z[-1]:.2f} m")
+        print(f"最终库容: {V[-1]:.2f} 万m³")
+        print(f"最大下泄流量: {q_max:.2f} m³/s")
+
+        return True
+    except Exception as e:
+        print(f"保存结果时出错: {e}")
+        return False
+
+
+# 演算模式 -> 主计算函数
+SIMULATION_MODES = {
+    'standard': calculate_flood_routing,
+    'continuous': calculate_flood_routing_continuous,
+}
+
+
 # ================================
 # 参数验证函数
 # ================================
@@ -298,6 +781,27 @@ def validate_parameters():
     if decimal_places < 0 or decimal_places > 6:
         errors.append("试算小数位数应在0-6之间")
 
+    if search_method not in TRIAL_METHODS:
+        errors.append(f"试算方式应为 {list(TRIAL_METHODS)} 之一")
+
+    if root_xtol <= 0:
+        errors.append("求根水位收敛精度必须大于0")
+
+    if simulation_mode not in SIMULATION_MODES:
+        errors.append(f"演算模式应为 {list(SIMULATION_MODES)} 之一")
+
+    if csv_chunk_rows <= 0:
+        errors.append("分块写出行数必须大于0")
+
+    if checkpoint_every < 0:
+        errors.append("检查点间隔时段数不能小于0")
+
+    if merge_interval_h < 0 or split_interval_h < 0:
+        errors.append("时段合并、加密的时长不能小于0")
+
+    if 0 < split_interval_h < merge_interval_h:
+        errors.append("时段加密时长不能小于合并时长")
+
     return errors
 
 
@@ -318,7 +822,7 @@ if __name__ == "__main__":
         print("请修改参数后重新运行程序。")
     else:
         print("参数验证通过")
-        success = calculate_flood_routing()
+        success = SIMULATION_MODES[simulation_mode]()
 
         if success:
             print("程序运行成功！")
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+水库调洪演算 —— 闸门调度规则（规则预编译为查算表）
+水量平衡：2V2/Δt + q2 = (Q1+Q2) + 2V1/Δt - q1
+--------------------------------------------------
+调度规则：水位分段下泄流量上限、下游安全泄量、按入库流量分级的目标开度、每时段开度变幅限制。
+规则只在开始时编译一次，得到：
+    目标开度表   target[入库流量级, 水位节点]
+    下泄能力表   release[开度档位, 水位节点]  = min(开度 × 全开泄流能力, 水位段上限, 安全泄量)
+    蓄量指示表   2V/Δt + release[开度档位, 水位节点]（按时段长缓存）
+演算时每时段只做数组查表，不再逐条判断规则
+--------------------------------------------------
+单位约定（内部计算）：
+    水位 z：m
+    库容 V：m³（读取时立即把“万m³”→m³）
+    流量 Q/q：m³/s
+输出 CSV 时再把 V 转回“万m³”
+"""
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+import floodroute as fr
+
+# ========== 用户参数区 ==========
+# 1. 文件路径（水位-下泄流量曲线视为闸门全开时的泄流能力）
+INFLOW_FILE   = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\3h入库流量过程线.csv"
+STORAGE_FILE  = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-库容曲线_linear.csv"
+DISCHARGE_FILE= r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-下泄流量曲线_linear.csv"
+OUT_FILE      = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\G1_闸门调度.csv"
+
+# 2. 文件编码 'gbk' 'utf-8' 'latin1'
+INFLOW_ENCODING   = 'utf-8'
+STORAGE_ENCODING  = 'utf-8'
+DISCHARGE_ENCODING= 'utf-8'
+
+# 3. 初始状态
+INITIAL_Z = 38.0          # m
+INITIAL_V = 6450          # 万 m³
+INITIAL_OPENING = 2       # 初始开度档位（GATE_OPENINGS 的下标）
+
+# 4. 调度规则
+Z_NODE_MIN  = 36.0        # 规则表水位范围与节点间隔
+Z_NODE_MAX  = 41.0
+Z_NODE_STEP = 0.01
+GATE_OPENINGS = [0.0, 0.25, 0.5, 0.75, 1.0]   # 闸门开度档位（占全开泄流能力的比例）
+MAX_OPENING_STEP = 1      # 每时段开度最多变化的档数
+INFLOW_BANDS = [0, 500, 1000]                  # 入库流量分级下限：[0,500)、[500,1000)、[1000,∞)
+# 水位分段规则：(水位下限, 各入库流量级目标开度档位, 下泄流量上限；None=不限)
+LEVEL_RULES = [
+    (36.0, [1, 2, 2], 300.0),
+    (38.0, [2, 3, 4], 600.0),
+    (39.5, [4, 4, 4], None),
+]
+SAFE_DISCHARGE = 700.0    # 下游安全泄量 (m³/s)
+SAFE_LEVEL     = 40.5     # 水位低于此值时下泄流量不超过下游安全泄量
+
+# 5. 输出字段
+OUT_COLS = ['时间t/h', '入库流量Q/(m³·s⁻¹)', '下泄流量q/(m³·s⁻¹)', '水库存水量V/万m³', '水库水位Z/m', '闸门开度']
+
+# ========== 工具函数 ==========
+def read_curves():
+    """读取两条曲线，返回 Z_sto, V_sto(m³), Z_dis, q_dis（查表用 fr.interp_extrap，两端线性外延）"""
+    return fr.read_curves(STORAGE_FILE, DISCHARGE_FILE, STORAGE_ENCODING, DISCHARGE_ENCODING)
+
+def read_inflow():
+    """读取入库流量过程"""
+    df = pd.read_csv(INFLOW_FILE, encoding=INFLOW_ENCODING)
+    t = df['时间t/h'].values
+    Q = df['Q/(m3/s-1)'].values
+    return t, Q
+
+# ========== 规则编译 ==========
+def compile_rules(Z_sto, V_sto, Z_dis, q_dis):
+    """
+    把调度规则编译为查算表
+    返回 Z_nodes、V_nodes(m³)、target[入库流量级, 水位节点]、release[开度档位, 水位节点]
+    """
+    Z_nodes = np.round(np.arange(Z_NODE_MIN, Z_NODE_MAX + Z_NODE_STEP / 2, Z_NODE_STEP), 6)
+    V_nodes = fr.interp_extrap(Z_nodes, Z_sto, V_sto)
+    q_full = fr.interp_extrap(Z_nodes, Z_dis, q_dis)
+
+    # 各水位节点所属水位段
+    level_lows = np.array([rule[0] for rule in LEVEL_RULES])
+    if np.any(np.diff(level_lows) <= 0):
+        raise ValueError('LEVEL_RULES 的水位下限必须递增')
+    level_idx = np.clip(np.searchsorted(level_lows, Z_nodes, side='right') - 1, 0, len(LEVEL_RULES) - 1)
+
+    # 目标开度表
+    rule_openings = np.array([rule[1] for rule in LEVEL_RULES])    # (水位段, 入库流量级)
+    if rule_openings.shape[1] != len(INFLOW_BANDS):
+        raise ValueError('LEVEL_RULES 中目标开度个数必须与 INFLOW_BANDS 一致')
+    if rule_openings.min() < 0 or rule_openings.max() >= len(GATE_OPENINGS):
+        raise ValueError('目标开度档位超出 GATE_OPENINGS 范围')
+    target = rule_openings[level_idx].T                             # (入库流量级, 水位节点)
+
+    # 下泄流量上限：水位段上限与下游安全泄量取小
+    level_limits = np.array([np.inf if rule[2] is None else rule[2] for rule in LEVEL_RULES])
+    limit = level_limits[level_idx]
+    limit = np.where(Z_nodes < SAFE_LEVEL, np.minimum(limit, SAFE_DISCHARGE), limit)
+
+    # 下泄能力表
+    release = np.minimum(np.outer(GATE_OPENINGS, q_full), limit)   # (开度档位, 水位节点)
+    return Z_nodes, V_nodes, target, release
+
+def indication_tables(V_nodes, release, dt):
+    """生成时段长 dt（秒）下各开度档位的 2V/Δt+q 表，要求严格单调递增"""
+    indication = 2 * V_nodes / dt + release
+    if not np.all(np.diff(indication, axis=1) > 0):
+        raise ValueError(f'时段长 {dt} s 下 2V/Δt+q 关系不单调，请检查调度规则中的下泄流量上限')
+    return indication
+
+# ========== 调度演算 ==========
+def route_with_rules(t_h, Q_in, Z_nodes, V_nodes, target, release):
+    """
+    按编译好的规则表逐时段演算
+    每时段：入库流量分级 → 查目标开度 → 按变幅限制确定开度 → 查蓄量指示表得 Z、q
+    右端超出蓄量指示表范围的时段按表端点取值，演算结束后汇总提示（与 floodroute 蓄量指示法相同）
+    """
+    n = len(t_h)
+    V = np.empty(n); z = np.empty(n); q = np.empty(n)
+    opening = np.empty(n, dtype=int)
+    V[0] = INITIAL_V * 1e4          # 万m³ → m³
+    z[0] = INITIAL_Z
+    opening[0] = INITIAL_OPENING
+    q[0] = np.interp(z[0], Z_nodes, release[opening[0]])
+
+    # 时段平均入库流量及其分级一次算出
+    Q_avg = 0.5 * (Q_in[:-1] + Q_in[1:])
+    bands = np.clip(np.searchsorted(INFLOW_BANDS, Q_avg, side='right') - 1, 0, len(INFLOW_BANDS) - 1)
+
+    tables = {}
+    n_out = 0
+    for i in tqdm(range(1, n), desc="闸门调度演算"):
+        dt = (t_h[i] - t_h[i-1]) * 3600
+        if dt not in tables:
+            tables[dt] = indication_tables(V_nodes, release, dt)
+
+        # 时段初水位所在节点的目标开度，受每时段变幅限制
+        node = min(max(int(round((z[i-1] - Z_NODE_MIN) / Z_NODE_STEP)), 0), len(Z_nodes) - 1)
+        o = target[bands[i-1], node]
+        o = min(max(o, opening[i-1] - MAX_OPENING_STEP), opening[i-1] + MAX_OPENING_STEP)
+
+        # 开度调整后时段初的下泄流量
+        q_start = np.interp(z[i-1], Z_nodes, release[o])
+        si = tables[dt][o]
+        value = 2 * Q_avg[i-1] + 2 * V[i-1] / dt - q_start
+        if not si[0] <= value <= si[-1]:
+            n_out += 1
+        z[i] = np.interp(value, si, Z_nodes)
+        q[i] = np.interp(value, si, release[o])
+        V[i] = V[i-1] + (Q_avg[i-1] - 0.5 * (q_start + q[i])) * dt
+        opening[i] = o
+    if n_out:
+        print(f"警告：共{n_out}个时段超出规则表水位范围[{Z_nodes[0]}, {Z_nodes[-1]}]，已按边界取值，"
+              f"请扩大 Z_NODE_MIN / Z_NODE_MAX")
+    return V, z, q, opening
+
+# ========== 主流程 ==========
+def main():
+    t_h, Q_in = read_inflow()
+    Z_nodes, V_nodes, target, release = compile_rules(*read_curves())
+    print(f"调度规则已编译：{len(INFLOW_BANDS)} 个入库流量级 × {len(GATE_OPENINGS)} 个开度档位 × {len(Z_nodes)} 个水位节点")
+
+    V, z, q, opening = route_with_rules(t_h, Q_in, Z_nodes, V_nodes, target, release)
+
+    results = pd.DataFrame({
+        '时间t/h': t_h,
+        '入库流量Q/(m³·s⁻¹)': Q_in,
+        '下泄流量q/(m³·s⁻¹)': q,
+        '水库存水量V/万m³': V * 1e-4,
+        '水库水位Z/m': z,
+        '闸门开度': np.asarray(GATE_OPENINGS)[opening],
+    })[OUT_COLS]
+    results.to_csv(OUT_FILE, index=False, encoding='utf-8-sig')
+    print(f"闸门调度演算完成！结果已保存至：{OUT_FILE}")
+    print(f"最高水位：{z.max():.2f} m，最大下泄流量：{q.max():.2f} m³/s")
+
+# ========== 运行 ==========
+if __name__ == '__main__':
+    main()
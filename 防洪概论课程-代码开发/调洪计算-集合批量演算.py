@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+水库调洪演算 —— 集合预报批量演算（蓄量指示法）
+水量平衡：2V2/Δt + q2 = (Q1+Q2) + 2V1/Δt - q1
+--------------------------------------------------
+输入为多成员入库流量过程（成员 × 时间），所有成员同时逐时段推进：
+每个时段对全部成员做一次数组查表，成员间共用同一张 2V/Δt+q 关系表
+流式统计模式下按批演算，只保留各成员最高水位与最大下泄流量并累加到固定分箱直方图，
+得到分位数与超过概率，内存占用与成员总数无关
+演算核心为 floodroute.route_storage_indication / route_storage_indication_peaks
+--------------------------------------------------
+单位约定（内部计算）：
+    水位 z：m
+    库容 V：m³（读取时立即把“万m³”→m³）
+    流量 Q/q：m³/s
+输出时再把 V 转回“万m³”
+"""
+import os
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+import floodroute as fr
+
+# ========== 用户参数区 ==========
+# 1. 文件路径
+# 集合入库流量文件：
+#   .csv 第一列 时间t/h，其余每列为一个成员的入库流量（m³/s）
+#   .npy 二维数组，第 0 行为时间 t/h，其余每行为一个成员（按内存映射分批读取，适合超大集合）
+#   流式统计时 .csv 先按行块转换为同名 .npy（只转换一次，CSV 更新后重新转换），再按内存映射分批读取
+ENSEMBLE_FILE = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\原始曲线\集合入库流量过程线.csv"
+STORAGE_FILE  = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-库容曲线_linear.csv"
+DISCHARGE_FILE= r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\曲线插值\插值水位-下泄流量曲线_linear.csv"
+OUT_NPZ       = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\D1_集合演算.npz"
+OUT_SUMMARY   = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\D1_集合演算统计.csv"
+OUT_STATS     = r"E:\水电202303班\大三（上期）\课程报告或小组作业\防洪概论（调洪计算）\代码开发\D1_集合极值分布.csv"
+
+# 2. 文件编码 'gbk' 'utf-8' 'latin1'
+ENSEMBLE_ENCODING = 'utf-8'
+STORAGE_ENCODING  = 'utf-8'
+DISCHARGE_ENCODING= 'utf-8'
+
+# 3. 初始状态 —— 标量表示所有成员相同，也可给出与成员数等长的列表
+INITIAL_Z = 38.0   # m
+INITIAL_V = None   # 万 m³；None=由水位-库容曲线按 INITIAL_Z 求得
+
+# 4. 关系表水位范围（超出曲线范围部分按曲线线性外延）
+Z_TABLE_MIN = 36.0
+Z_TABLE_MAX = 41.0
+
+# 5. 流式极值统计
+STREAMING        = False                     # True=不保存成员轨迹，只统计最高水位/最大下泄流量分布
+BATCH_SIZE       = 10000                     # 每批演算的成员数
+QUANTILES        = [0.5, 0.9, 0.95, 0.99, 0.999]
+CHECK_LEVELS     = [40.0, 40.5]              # 统计超过概率的水位（m）
+CHECK_DISCHARGES = [600.0, 800.0]            # 统计超过概率的下泄流量（m³/s）
+Z_BIN_WIDTH      = 0.001                     # 直方图分箱宽度，即分位数精度（m）
+Q_BIN_WIDTH      = 0.1                       # （m³/s）
+CSV_CHUNK_ROWS   = 10000                     # CSV 转换为 .npy 时每次读取的行数（时刻数），内存只占一个行块
+ENSEMBLE_NPY     = None                      # CSV 转换得到的 .npy 路径；None=与 CSV 同目录同名
+
+# ========== 工具函数 ==========
+def read_curves():
+    """读取两条曲线，返回水位节点上的 Z、V(m³)、q 表"""
+    curves = fr.read_curves(STORAGE_FILE, DISCHARGE_FILE, STORAGE_ENCODING, DISCHARGE_ENCODING)
+    # 节点取两曲线水位并集，节点间两曲线均为线性，查表结果与原曲线插值一致
+    return fr.indication_nodes(*curves, Z_TABLE_MIN, Z_TABLE_MAX)
+
+def read_ensemble():
+    """读取集合入库流量，返回 t(h)、成员名、Q(成员 × 时间)"""
+    df = pd.read_csv(ENSEMBLE_FILE, encoding=ENSEMBLE_ENCODING)
+    t = df['时间t/h'].values.astype(float)
+    members = [c for c in df.columns if c != '时间t/h']
+    Q = df[members].values.T.astype(float)
+    return t, members, Q
+
+def ensemble_csv_to_npy(csv_file, npy_file):
+    """
+    把集合 CSV（每列一个成员）按 CSV_CHUNK_ROWS 行一块流式转置写入 .npy（第 0 行时间，其余每行一个成员），
+    内存只占一个行块；先写临时文件再替换，中断时不留下不完整的文件。返回成员名
+    """
+    columns = list(pd.read_csv(csv_file, encoding=ENSEMBLE_ENCODING, nrows=0).columns)
+    members = [c for c in columns if c != '时间t/h']
+    n_rows = sum(len(chunk) for chunk in pd.read_csv(csv_file, encoding=ENSEMBLE_ENCODING, usecols=['时间t/h'],
+                                                     chunksize=CSV_CHUNK_ROWS))
+    tmp_file = npy_file + '.tmp'
+    out = np.lib.format.open_memmap(tmp_file, mode='w+', dtype=float, shape=(len(members) + 1, n_rows))
+    row = 0
+    for chunk in tqdm(pd.read_csv(csv_file, encoding=ENSEMBLE_ENCODING, chunksize=CSV_CHUNK_ROWS),
+                      desc="集合 CSV 转换为 .npy"):
+        out[:, row:row + len(chunk)] = chunk[['时间t/h'] + members].values.T
+        row += len(chunk)
+    out.flush()
+    del out
+    os.replace(tmp_file, npy_file)
+    return members
+
+def iter_ensemble_batches(batch_size):
+    """按批读取集合入库流量（内存映射，不整体载入），逐批返回 t(h)、成员名、Q(本批成员 × 时间)"""
+    if ENSEMBLE_FILE.lower().endswith('.npy'):
+        npy_file, members = ENSEMBLE_FILE, None
+    else:
+        npy_file = ENSEMBLE_NPY or os.path.splitext(ENSEMBLE_FILE)[0] + '.npy'
+        if os.path.exists(npy_file) and os.path.getmtime(npy_file) >= os.path.getmtime(ENSEMBLE_FILE):
+            members = [c for c in pd.read_csv(ENSEMBLE_FILE, encoding=ENSEMBLE_ENCODING, nrows=0).columns
+                       if c != '时间t/h']
+        else:
+            members = ensemble_csv_to_npy(ENSEMBLE_FILE, npy_file)
+    data = np.load(npy_file, mmap_mode='r')
+    t = np.asarray(data[0], dtype=float)
+    for lo in range(1, data.shape[0], batch_size):
+        hi = min(lo + batch_size, data.shape[0])
+        names = [f'成员{k}' for k in range(lo, hi)] if members is None else members[lo - 1:hi - 1]
+        yield t, names, np.asarray(data[lo:hi], dtype=float)
+
+# ========== 流式极值统计 ==========
+class PeakStatistics:
+    """
+    固定分箱直方图 + 超过计数器
+    update() 可按成员或按批反复调用，内存只与分箱数有关；
+    分位数误差不超过一个分箱宽度，超过概率为精确计数
+    """
+    def __init__(self, lo, hi, width, thresholds):
+        self.lo = lo
+        self.width = width
+        self.counts = np.zeros(int(np.ceil((hi - lo) / width)) + 1, dtype=np.int64)
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.exceed = np.zeros(len(self.thresholds), dtype=np.int64)
+        self.n = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, x):
+        x = np.asarray(x, dtype=float).ravel()
+        if x.size == 0:
+            return
+        idx = np.clip(np.floor((x - self.lo) / self.width), 0, len(self.counts) - 1).astype(np.int64)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        self.exceed += (x[:, None] > self.thresholds[None, :]).sum(axis=0)
+        self.n += x.size
+        self.total += x.sum()
+        self.min = min(self.min, x.min())
+        self.max = max(self.max, x.max())
+
+    def quantile(self, p):
+        """第 p 分位数：分箱内线性插值，并限制在已见到的最小、最大值之间"""
+        cum = np.cumsum(self.counts)
+        rank = p * self.n
+        k = min(int(np.searchsorted(cum, rank, side='left')), len(cum) - 1)
+        inside = (rank - (cum[k] - self.counts[k])) / max(self.counts[k], 1)
+        return float(np.clip(self.lo + (k + inside) * self.width, self.min, self.max))
+
+    def exceedance(self):
+        """各阈值的超过概率"""
+        return self.exceed / max(self.n, 1)
+
+# ========== 主流程 ==========
+def main_streaming():
+    """按批演算并累加极值分布，不保存成员轨迹"""
+    Z_nodes, V_nodes, q_nodes = read_curves()
+    Z0 = np.asarray(INITIAL_Z, dtype=float)
+    V0 = None if INITIAL_V is None else np.asarray(INITIAL_V, dtype=float) * 1e4   # 万m³ → m³
+    # 查表结果限制在关系表范围内，直方图范围即关系表范围
+    z_stats = PeakStatistics(Z_nodes[0], Z_nodes[-1], Z_BIN_WIDTH, CHECK_LEVELS)
+    q_stats = PeakStatistics(0.0, q_nodes.max(), Q_BIN_WIDTH, CHECK_DISCHARGES)
+
+    tables = {}
+    n_out = 0
+    for t_h, members, Q in tqdm(iter_ensemble_batches(BATCH_SIZE), desc="集合极值统计"):
+        lo, hi = z_stats.n, z_stats.n + len(members)
+        Z0_batch = Z0 if Z0.ndim == 0 else Z0[lo:hi]
+        V0_batch = V0 if V0 is None or V0.ndim == 0 else V0[lo:hi]
+        Z_max, q_max, out = fr.route_storage_indication_peaks(t_h, Q, Z0_batch, Z_nodes, V_nodes, q_nodes,
+                                                              V0=V0_batch, warn=False, tables=tables)
+        z_stats.update(Z_max)
+        q_stats.update(q_max)
+        n_out += np.count_nonzero(out)
+
+    if n_out:
+        print(f"警告：{n_out} 个成员超出关系表水位范围[{Z_TABLE_MIN}, {Z_TABLE_MAX}]，已按边界取值，请调整关系表上下限")
+
+    rows = []
+    for name, stats in (('最高水位Z/m', z_stats), ('最大下泄流量q/(m³·s⁻¹)', q_stats)):
+        rows.append({'特征值': name, '统计量': '成员数', '数值': stats.n})
+        rows.append({'特征值': name, '统计量': '均值', '数值': stats.total / stats.n})
+        rows.append({'特征值': name, '统计量': '最小值', '数值': stats.min})
+        rows.append({'特征值': name, '统计量': '最大值', '数值': stats.max})
+        for p in QUANTILES:
+            rows.append({'特征值': name, '统计量': f'{p:g} 分位数', '数值': stats.quantile(p)})
+        for threshold, prob in zip(stats.thresholds, stats.exceedance()):
+            rows.append({'特征值': name, '统计量': f'超过 {threshold:g} 的概率', '数值': prob})
+    pd.DataFrame(rows).to_csv(OUT_STATS, index=False, encoding='utf-8-sig')
+    print(f"集合极值统计完成！共 {z_stats.n} 个成员，统计结果已保存至：{OUT_STATS}")
+    for threshold, prob in zip(z_stats.thresholds, z_stats.exceedance()):
+        print(f"  最高水位超过 {threshold:g} m 的概率：{prob:.4%}")
+
+def main():
+    if STREAMING:
+        main_streaming()
+        return
+
+    t_h, members, Q = read_ensemble()
+    Z_nodes, V_nodes, q_nodes = read_curves()
+    print(f"读取集合入库流量：{len(members)} 个成员，{len(t_h)} 个时刻")
+
+    V0 = None if INITIAL_V is None else np.asarray(INITIAL_V, dtype=float) * 1e4   # 万m³ → m³
+    Z, q, V = fr.route_storage_indication(t_h, Q, np.asarray(INITIAL_Z, dtype=float), Z_nodes, V_nodes, q_nodes,
+                                          V0=V0)
+
+    # 成员轨迹（V 转回万m³）
+    np.savez_compressed(OUT_NPZ, t=t_h, members=np.array(members), Q=Q,
+                        Z=Z, V=V * 1e-4, q=q)
+
+    # 各成员特征值
+    summary = pd.DataFrame({
+        '成员': members,
+        '最高水位Z/m': Z.max(axis=1),
+        '最大库容V/万m³': V.max(axis=1) * 1e-4,
+        '最大下泄流量q/(m³·s⁻¹)': q.max(axis=1),
+        '最大入库流量Q/(m³·s⁻¹)': Q.max(axis=1),
+    })
+    summary.to_csv(OUT_SUMMARY, index=False, encoding='utf-8-sig')
+    print(f"集合调洪完成！成员轨迹已保存至：{OUT_NPZ}")
+    print(f"成员特征值已保存至：{OUT_SUMMARY}")
+    print(f"最高水位范围：{Z.max(axis=1).min():.2f} ~ {Z.max(axis=1).max():.2f} m")
+
+# ========== 运行 ==========
+if __name__ == '__main__':
+    main()
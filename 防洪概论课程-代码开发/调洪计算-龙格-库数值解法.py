@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 """
-水库调洪演算 —— 定步长四阶龙格-库塔法（RK4）
+水库调洪演算 —— 定步长四阶龙格-库塔法（RK4）/ 自适应步长嵌入式龙格-库塔法 / 隐式法
 微分方程：dV/dt = Q(t) - q(z)
+隐式法（θ 格式）：V₁ = V₀ + Δt·[(1-θ)(Q₀ - q(V₀)) + θ(Q₁ - q(V₁))]
+    θ=1 向后欧拉，θ=0.5 梯形公式；q(V) 单调，用牛顿迭代求 V₁，
+    小库容、泄流对水位敏感（刚性）时按原始时段长演算也不会振荡发散
 --------------------------------------------------
 单位约定（内部计算）：
     水位 z：m
@@ -10,12 +13,13 @@
 输出 CSV 时再把 V 转回“万m³”方便查看
 --------------------------------------------------
 如需考虑闸门调度规则，请准备对应水位→泄流量曲线并替换下方文件路径
+查表、RK4 / 隐式法单步、入库流量插值取自 floodroute 包（与实时滚动演算等脚本共用），本脚本只保留自适应步长积分；
+模块顶层只加载 NumPy，scipy 在自适应步长或 'pchip' 入流插值时、tqdm 在定步长逐时段演算时才加载，读取缓存结果时都不加载
 """
-import os
+import json
+import time
 import numpy as np
-import pandas as pd
-from scipy.interpolate import interp1d
-from tqdm import tqdm
+import floodroute as fr
 
 # ========== 用户参数区 ==========
 # 1. 文件路径
@@ -29,8 +33,9 @@ INFLOW_ENCODING   = 'utf-8'
 STORAGE_ENCODING  = 'utf-8'
 DISCHARGE_ENCODING= 'utf-8'
 
-# 3. 时间步长（秒）—— 用户可改 与入库流量过程线的 时间间隔相同（插值间隔）
-DT = 3600*3          # 3600 s = 1 h；可改为 1800、900 等
+# 3. 时段长 —— 逐时段取入库流量过程线相邻 时间t/h 之差，可不等间隔（缺测时段、加密观测均可直接演算）
+MERGE_DT_H = 0       # 短于该值（h）的时段与后续时段合并（洪峰时刻保留，合并前后水量不变）；0=不合并
+SPLIT_DT_H = 0       # 长于该值（h）的时段等分加密，加密时刻入库流量线性插值；0=不加密
 
 # 4. 初始状态 V0 —— 用户可改
 INITIAL_Z = 38.0   # m
@@ -39,88 +44,169 @@ INITIAL_V = 6450   # 万 m³（脚本内立即×1e4 转成 m³）
 # 5. 输出字段
 OUT_COLS = ['时间t/h', '入库流量Q/(m³·s⁻¹)', '下泄流量q/(m³·s⁻¹)', '水库存水量V/万m³', '水库水位Z/m']
 
+# 6. 逐时段求解记录（JSON lines：函数求值次数、耗时）；None=不记录
+TELEMETRY_FILE = None
+
+# 7. 时段内入库流量
+INFLOW_INTERP = 'average'  # 'average' 各阶段均用时段平均值（原方法）；'linear' 分段线性；'pchip' 保单调三次
+                           # 后两者在各阶段时刻取值，粗时段（如 3h）过程线无需先插值加密
+
+# 8. 求解方式
+SOLVER = 'rk4'           # 'rk4' 逐时段 RK4（原方法）；'adaptive' 自适应步长，按误差估计自动加密/放大步长
+                         # 'implicit_euler' 向后欧拉；'trapezoidal' 梯形公式（隐式，逐时段）
+ADAPTIVE_METHOD = 'RK45' # 'RK45' Dormand–Prince 5(4)；'RK23' Bogacki–Shampine 3(2)
+V_ATOL = 1e3             # 库容绝对容差（m³）
+V_RTOL = 1e-6            # 库容相对容差
+MAX_STEP = np.inf        # 最大步长（s）；np.inf=不限，可跨越多个入库时段
+NEWTON_TOL = 1e-3        # 隐式法牛顿迭代库容容差（m³）
+NEWTON_MAX_ITER = 50     # 隐式法最大迭代次数
+
+# 9. 结果缓存目录（与 调洪计算-龙格-库数值解法-可视化.py 共用）；None=不缓存
+CACHE_DIR = None
+
 # ========== 工具函数 ==========
 def read_curves():
-    """读取三条曲线，返回插值函数"""
-    sto = pd.read_csv(STORAGE_FILE,  encoding=STORAGE_ENCODING)
-    dis = pd.read_csv(DISCHARGE_FILE,encoding=DISCHARGE_ENCODING)
-    # 库容曲线：万m³ → m³
-    Z_sto, V_sto = sto['水位Z/m'].values, sto['库容V/万m3'].values * 1e4
-    # 泄流曲线：m³/s 不变
-    Z_dis, q_dis = dis['水位Z/m'].values, dis['下泄流量q/(m3·s)'].values
-
-    storage_interp = interp1d(Z_sto, V_sto, kind='linear', bounds_error=False, fill_value='extrapolate')
-    discharge_interp= interp1d(Z_dis, q_dis, kind='linear', bounds_error=False, fill_value='extrapolate')
-    # 反插：V → Z
-    V_Z_interp = interp1d(V_sto, Z_sto, kind='linear', bounds_error=False, fill_value='extrapolate')
-    return storage_interp, discharge_interp, V_Z_interp
+    """读取两条曲线，返回 Z_sto, V_sto(m³), Z_dis, q_dis"""
+    return fr.read_curves(STORAGE_FILE, DISCHARGE_FILE, STORAGE_ENCODING, DISCHARGE_ENCODING)
 
 def read_inflow():
     """读取入库流量过程"""
-    df = pd.read_csv(INFLOW_FILE, encoding=INFLOW_ENCODING)
     # 假设列名：时间t/h  与  Q/(m3/s-1)  如不同请自行改
-    t = df['时间t/h'].values
-    Q = df['Q/(m3/s-1)'].values
-    return t, Q
+    return fr.read_table(INFLOW_FILE, ['时间t/h', 'Q/(m3/s-1)'], INFLOW_ENCODING)
 
-# ========== RK4 核心 ==========
-def rk4_step(V_prev, Q_avg, storage_interp, discharge_interp, V_Z_interp, dt):
+def run_hash():
+    """输入文件内容与全部演算参数的哈希，作为结果缓存的键"""
+    params = ['rk4', MERGE_DT_H, SPLIT_DT_H, INITIAL_Z, INITIAL_V, INFLOW_INTERP, SOLVER,
+              ADAPTIVE_METHOD, V_ATOL, V_RTOL, MAX_STEP, NEWTON_TOL, NEWTON_MAX_ITER]
+    return fr.run_hash((INFLOW_FILE, STORAGE_FILE, DISCHARGE_FILE), params)
+
+# ========== 自适应步长核心 ==========
+def route_adaptive(t_h, Q_in, V0, V_z, V_q, stats=None):
     """
-    单步 RK4 积分
-    返回下一时刻 V 及对应 z、q
+    自适应步长嵌入式龙格-库塔积分（scipy solve_ivp）
+    入库流量在相邻时刻间按 INFLOW_INTERP 连续变化（'average' 按线性处理，时段水量与梯形平均相同），
+    步长由库容误差估计控制，
+    各原始时刻的结果取自稠密输出，不要求步长与入库时段对齐
+    返回各时刻 V(m³)、z、q 数组与 dV/dt 总求值次数；stats 不为 None 时记录各时段内的求值次数与耗时
+    （相邻两次求值的间隔计入后一次求值所在的时段）
     """
-    def dVdt(V):
-        z = float(V_Z_interp(V))
-        q = float(discharge_interp(z))
-        return Q_avg - q   # m³/s
-
-    k1 = dVdt(V_prev)
-    k2 = dVdt(V_prev + 0.5*dt*k1)
-    k3 = dVdt(V_prev + 0.5*dt*k2)
-    k4 = dVdt(V_prev +       dt*k3)
-
-    V_new = V_prev + (dt/6.0)*(k1 + 2*k2 + 2*k3 + k4)
-    z_new = float(V_Z_interp(V_new))
-    q_new = float(discharge_interp(z_new))
-    return V_new, z_new, q_new
+    from scipy.integrate import solve_ivp
+    t_s = np.asarray(t_h, dtype=float) * 3600
+    if INFLOW_INTERP == 'pchip':
+        pchip = fr.inflow_function(t_s, Q_in, 'pchip')
+        Q_t = lambda t: float(pchip(t))
+    else:
+        Q_t = fr.make_lookup(t_s, Q_in)
+    calls = [] if stats is not None else None
+
+    def dVdt(t, V):
+        if calls is not None:
+            calls.append((t, time.perf_counter()))
+        return [Q_t(t) - V_q(V[0])]
+
+    solve_start = time.perf_counter()
+    sol = solve_ivp(dVdt, (t_s[0], t_s[-1]), [V0], method=ADAPTIVE_METHOD, t_eval=t_s,
+                    rtol=V_RTOL, atol=V_ATOL, max_step=MAX_STEP)
+    if not sol.success:
+        raise RuntimeError(f'自适应步长积分失败：{sol.message}')
+
+    V = sol.y[0]
+    if stats is not None:
+        # 求值按所在入库时段归类
+        t_calls, clock = np.array(calls).T
+        interval = np.clip(np.searchsorted(t_s, t_calls, side='left'), 1, len(t_s) - 1)
+        stats['evaluations'] = np.bincount(interval, minlength=len(t_s))
+        stats['wall_time'] = np.bincount(interval, weights=np.diff(clock, prepend=solve_start), minlength=len(t_s))
+    return V, np.array([V_z(v) for v in V]), np.array([V_q(v) for v in V]), sol.nfev
 
 # ========== 主流程 ==========
-def main():
+def route():
+    """
+    读取输入并按 SOLVER 演算，返回 t_h、Q_in 与各时刻 V(m³)、z、q 数组
+    CACHE_DIR 中有相同输入文件与参数的结果时直接读取，不再重复演算
+    """
+    key = run_hash() if CACHE_DIR else None
+    cached = fr.load_cache(CACHE_DIR, 'rk4', key)
+    if cached is not None:
+        print(f"读取缓存的演算结果：{fr.cache_path(CACHE_DIR, 'rk4', key)}")
+        return cached['t'], cached['Q'], cached['V'], cached['z'], cached['q']
+
     t_h, Q_in = read_inflow()
-    storage_interp, discharge_interp, V_Z_interp = read_curves()
+    n_raw = len(t_h)
+    t_h, Q_in = fr.regularize_time_steps(t_h, Q_in, MERGE_DT_H, SPLIT_DT_H)
+    dt = np.diff(t_h) * 3600     # 各时段长（s）
+    if len(t_h) != n_raw:
+        print(f"时段整理：{n_raw} 个时刻 → {len(t_h)} 个时刻")
+    Z_sto, V_sto, Z_dis, q_dis = read_curves()
+    V_z, V_q = fr.build_V_lookups(Z_sto, V_sto, Z_dis, q_dis)
 
     # 初始值
     V0 = INITIAL_V * 1e4          # 万m³ → m³
     z0 = INITIAL_Z
-    q0 = float(discharge_interp(z0))
+    q0 = fr.make_lookup(Z_dis, q_dis)(z0)
 
     # 结果容器
     V_list = [V0]
     z_list = [z0]
     q_list = [q0]
 
-    # 逐时段 RK4 积分
-    for i in tqdm(range(1, len(t_h)), desc="RK4 调洪计算"):
-        # 时段平均入库流量（梯形假设）
-        Q_avg = 0.5 * (Q_in[i-1] + Q_in[i])
-        V_new, z_new, q_new = rk4_step(V_list[-1], Q_avg,
-                                       storage_interp, discharge_interp, V_Z_interp, DT)
-        V_list.append(V_new)
-        z_list.append(z_new)
-        q_list.append(q_new)
-
-    # 组装 DataFrame（V 转回万m³）
-    results = pd.DataFrame({
-        '时间t/h': t_h,
-        '入库流量Q/(m³·s⁻¹)': Q_in,
-        '下泄流量q/(m³·s⁻¹)': q_list,
-        '水库存水量V/万m³': np.array(V_list) * 1e-4,
-        '水库水位Z/m': z_list
-    })[OUT_COLS]
-
-    results.to_csv(OUT_FILE, index=False, encoding='utf-8-sig')
-    print(f"RK4 调洪完成！结果已保存至：{OUT_FILE}")
-    print("输出列：", list(results.columns))
+    telemetry = []
+    stats = {} if TELEMETRY_FILE else None
+    if SOLVER == 'adaptive':
+        # 自适应步长积分，稠密输出取在原始时刻
+        solve_start = time.perf_counter()
+        V_list, z_list, q_list, nfev = route_adaptive(t_h, Q_in, V0, V_z, V_q, stats)
+        # 首行与定步长方法一致取初始水位与对应下泄流量，而不是由 V0 反查
+        z_list[0], q_list[0] = z0, q0
+        print(f"自适应步长（{ADAPTIVE_METHOD}）积分完成：{len(t_h) - 1} 个时段，dV/dt 求值 {nfev} 次"
+              f"（定步长 RK4 为 {4 * (len(t_h) - 1)} 次），耗时 {time.perf_counter() - solve_start:.3f} s")
+        if stats is not None:
+            telemetry = [dict(row=i + 1, time_h=t_h[i], evaluations=int(stats['evaluations'][i]),
+                              iterations=None, residual=None, fallback=False,
+                              wall_time=float(stats['wall_time'][i]))
+                         for i in range(1, len(t_h))]
+    elif SOLVER in fr.STEP_FUNCTIONS:
+        step = fr.STEP_FUNCTIONS[SOLVER]
+        step_options = {} if SOLVER == 'rk4' else dict(tol=NEWTON_TOL, max_iter=NEWTON_MAX_ITER)
+        # 显式 RK4 对线性问题的稳定条件约为 Δt·dq/dV < 2.78
+        if SOLVER == 'rk4' and dt.max() * V_q.max_slope > 2.78:
+            print(f"警告：Δt·max(dq/dV) = {dt.max() * V_q.max_slope:.2f} > 2.78，RK4 可能振荡发散，"
+                  f"请设置 SPLIT_DT_H 加密时段或改用 SOLVER = 'implicit_euler'")
+        # 各阶段时刻的入库流量
+        Q_start, Q_mid, Q_end = fr.inflow_stages(t_h, Q_in, INFLOW_INTERP)
+        # 逐时段积分
+        from tqdm import tqdm
+        for i in tqdm(range(1, len(t_h)), desc=f"{SOLVER} 调洪计算"):
+            step_start = time.perf_counter()
+            Q_stages = (Q_start[i-1], Q_mid[i-1], Q_end[i-1])
+            V_new, z_new, q_new = step(V_list[-1], Q_stages, V_z, V_q, dt[i-1], stats, **step_options)
+            if stats is not None:
+                telemetry.append(dict(row=i + 1, time_h=t_h[i], **stats, wall_time=time.perf_counter() - step_start))
+            V_list.append(V_new)
+            z_list.append(z_new)
+            q_list.append(q_new)
+    else:
+        raise ValueError(f'Unsupported solver: {SOLVER}')
+
+    if telemetry:
+        with open(TELEMETRY_FILE, 'w', encoding='utf-8') as f:
+            for record in telemetry:
+                f.write(json.dumps(record, ensure_ascii=False, default=lambda v: v.item()) + '\n')
+        print(f"求解记录已保存至：{TELEMETRY_FILE}（总耗时 {sum(r['wall_time'] for r in telemetry):.3f} s，"
+              f"总求值次数 {sum(r['evaluations'] for r in telemetry)}）")
+
+    V, z, q = np.array(V_list), np.array(z_list), np.array(q_list)
+    fr.save_cache(CACHE_DIR, 'rk4', key, t=t_h, Q=Q_in, V=V, z=z, q=q)
+    return t_h, Q_in, V, z, q
+
+def main():
+    t_h, Q_in, V, z, q = route()
+
+    # 按 OUT_COLS 顺序输出（V 转回万m³）
+    results = dict(zip(OUT_COLS, (t_h, Q_in, q, V * 1e-4, z)))
+    fr.write_table(OUT_FILE, results)
+    print(f"{SOLVER} 调洪完成！结果已保存至：{OUT_FILE}")
+    print("输出列：", list(results))
 
 # ========== 运行 ==========
 if __name__ == '__main__':